@@ -32,13 +32,17 @@ class Agent:
     Class for an agent
     """
 
-    def __init__(self, name, preference_string, voting_scheme):
+    __slots__ = ("name", "preferences", "profile", "index")
+
+    def __init__(self, name, preference_string, voting_scheme, profile=None, index=None):
         """
         Constructor for an agent
 
         :param name: A string for the name of the agent
         :param preference_string: A string indicating the preferences in order
         :param voting_scheme: A voting scheme object (Borda, Plurality, etc.)
+        :param profile: A preference profile object whose row holds the preferences of the agent, or None
+        :param index: An integer indicating the row of the agent in the profile, or None
         """
 
         self.name = name
@@ -51,6 +55,30 @@ class Agent:
         # Tally votes depending on voting scheme
         voting_scheme().tally_personal_votes(self.preferences)
 
+        # The ranks of agents of a profile are read from its row, instead of being stored per agent
+        self.profile = profile
+        self.index = index
+
+    @classmethod
+    def from_profile(cls, name, profile, index, voting_scheme):
+        """
+        Creates an agent from a row of a preference profile
+
+        :param name: A string for the name of the agent
+        :param profile: A preference profile object
+        :param index: An integer indicating the row of the agent in the profile
+        :param voting_scheme: A voting scheme object (Borda, Plurality, etc.)
+        :return: Returns an agent object
+        """
+        return cls(name, profile.get_preference_string(index), voting_scheme, profile, index)
+
+    @property
+    def ballot(self):
+        """
+        :return: Returns a tuple of candidates in the preference order of the agent
+        """
+        return tuple(self.preferences)
+
     def __str__(self):
         """
         String representation of an agent will be their name
@@ -67,6 +95,25 @@ class Agent:
         """
         return self.preferences
 
+    def get_ballot_type(self):
+        """
+        Gets the ballot type of the agent. Agents with the same ballot type have the same (current) preference order,
+        and so the same happiness and tactical options in any election
+
+        :return: Returns a tuple of candidates in preference order
+        """
+        return self.ballot
+
+    def get_rank(self, candidate):
+        """
+        :param candidate: A string indicating a candidate
+        :return: Returns an integer indicating the position of the candidate in the preferences of the agent
+        """
+        if self.profile is None:
+            return self.ballot.index(candidate)
+
+        return self.profile.ranks[self.index, self.profile.candidate_indices[candidate]].item()
+
     def get_happiness(self, result_dict):
         """
         Computes happiness of an agent
@@ -75,24 +122,32 @@ class Agent:
         :return: Returns a dictionary of happiness values, representing the agent's happiness in different ways
         """
         happiness_dict = {}
+        ballot = self.ballot
+        m = len(ballot)
 
         """
         What is the index of the winner in my preference list
         """
-        pref_list = list(self.preferences.keys())
-        index = pref_list.index(get_winner(result_dict))
+        index = self.get_rank(get_winner(result_dict))
 
-        happiness_dict["H_p"] = ((len(pref_list) - index - 1)/(len(pref_list) - 1)) * 100
+        happiness_dict["H_p"] = ((m - index - 1)/(m - 1)) * 100
 
         """
         What is the index of my first preference in the results
         """
-        result_list = sorted(result_dict, key=lambda k: result_dict[k], reverse=True)
+        # The position in the sorted results is the number of candidates with more votes, plus the candidates with
+        # as many votes that come first in the results, since sorting keeps ties in order
+        first_preference = ballot[0]
+        votes = result_dict[first_preference]
+        index = 0
+        is_before = True
 
-        index = result_list.index(pref_list[0])
+        for candidate in result_dict:
+            if candidate == first_preference:
+                is_before = False
+            elif result_dict[candidate] > votes or (is_before and result_dict[candidate] == votes):
+                index += 1
 
-        happiness_dict["H_si"] = ((len(result_list) - index - 1)/(len(result_list) - 1)) * 100
+        happiness_dict["H_si"] = ((len(result_dict) - index - 1)/(len(result_dict) - 1)) * 100
 
         return happiness_dict
-
-
@@ -0,0 +1,64 @@
+import numpy as np
+
+
+# Tables are built for up to 10 candidates, which has 10! = 3628800 ballots and takes about 36 MB
+MAX_TABLE_CANDIDATES = 10
+
+permutation_tables = {}
+
+
+class PermutationTable:
+    """
+    Class for a permutation table
+
+    A permutation table holds all m! ballots of m candidates in lexicographic order, so that the row of a ballot is its
+    Lehmer code
+    """
+
+    def __init__(self, num_candidates):
+        """
+        Constructor for a permutation table. The ballots of k candidates are built from the ballots of k - 1 candidates,
+        by putting every candidate first in turn, followed by the ballots of the remaining candidates
+
+        :param num_candidates: An integer indicating the number of candidates
+        """
+        if num_candidates > MAX_TABLE_CANDIDATES:
+            raise Exception(f"Permutation tables are limited to {MAX_TABLE_CANDIDATES} candidates")
+
+        self.num_candidates = num_candidates
+
+        permutations = np.zeros((1, 0), dtype=np.int8)
+
+        for k in range(1, num_candidates + 1):
+            blocks = []
+
+            for first in range(k):
+                block = np.empty((len(permutations), k), dtype=np.int8)
+                block[:, 0] = first
+                block[:, 1:] = np.delete(np.arange(k, dtype=np.int8), first)[permutations]
+                blocks.append(block)
+
+            permutations = np.concatenate(blocks)
+
+        self.permutations = permutations
+
+    def __len__(self):
+        """
+        The length of a table is its number of ballots
+
+        :return: Returns an integer indicating m!
+        """
+        return len(self.permutations)
+
+
+def get_permutation_table(num_candidates):
+    """
+    Gets the permutation table of a number of candidates. Every table is only built once
+
+    :param num_candidates: An integer indicating the number of candidates
+    :return: Returns a permutation table object
+    """
+    if num_candidates not in permutation_tables:
+        permutation_tables[num_candidates] = PermutationTable(num_candidates)
+
+    return permutation_tables[num_candidates]
@@ -0,0 +1,217 @@
+import numpy as np
+
+
+def get_tie_order(candidate_string):
+    """
+    Ties are won by the candidate whose name begins with the lowest letter in the alphabet
+
+    :param candidate_string: A string of candidates, for example: "ABCDEFG"
+    :return: Returns a numpy array with the candidate indices in alphabetical order
+    """
+    return np.argsort(np.array(list(candidate_string)), kind="stable")
+
+
+def get_winner_indices(tallies, tie_order):
+    """
+    Returns the index of the winning candidate of one or more tallies, with ties broken alphabetically as in
+    get_winner
+
+    :param tallies: A numpy array with the votes of each candidate in its last axis
+    :param tie_order: A numpy array with the candidate indices in alphabetical order
+    :return: Returns a numpy array with the index of the winner of every tally
+    """
+    return tie_order[np.argmax(tallies[..., tie_order], axis=-1)]
+
+
+def get_happiness_arrays(ballots, ranks, tallies, tie_order):
+    """
+    Computes the happiness of all agents of one or more elections at once
+
+    H_p follows from the position of the winner in the preferences of every agent, and H_si from the position of
+    the first preference of every agent in the sorted results. The sorted results only need a single argsort per
+    election, which keeps ties in the order of the candidate string like Agent.get_happiness does
+
+    :param ballots: A (... x voters x candidates) numpy array with the candidate indices in preference order
+    :param ranks: A (... x voters x candidates) numpy array with the position of every candidate
+    :param tallies: A (... x candidates) numpy array with the votes of each candidate
+    :param tie_order: A numpy array with the candidate indices in alphabetical order
+    :return: Returns a dictionary with a (... x voters) numpy array of happiness values per type of happiness
+    """
+    m = ballots.shape[-1]
+    winners = get_winner_indices(tallies, tie_order)
+
+    result_positions = np.empty(tallies.shape, dtype=np.intp)
+    np.put_along_axis(result_positions, np.argsort(-tallies, axis=-1, kind="stable"),
+                      np.arange(m, dtype=np.intp), axis=-1)
+
+    winner_ranks = np.take_along_axis(ranks, winners[..., np.newaxis, np.newaxis].astype(np.intp), axis=-1)[..., 0]
+    first_positions = np.take_along_axis(result_positions, ballots[..., 0].astype(np.intp), axis=-1)
+
+    return {"H_p": (m - 1 - winner_ranks) / (m - 1) * 100,
+            "H_si": (m - 1 - first_positions) / (m - 1) * 100}
+
+
+class PreferenceProfile:
+    """
+    Class for a preference profile
+
+    A preference profile holds the preferences of every agent in an election as a dense integer matrix, instead of one
+    preference dictionary per agent. Candidates are encoded by their index in the candidate string, so that tallies,
+    happiness and tactical searches can be done with array operations
+    """
+
+    def __init__(self, candidate_string, ballots):
+        """
+        Constructor for a preference profile
+
+        :param candidate_string: A string of candidates, for example: "ABCDEFG"
+        :param ballots: A (voters x candidates) array like, where row i holds the candidate indices of agent i in
+        preference order
+        """
+
+        self.candidate_string = candidate_string
+        self.num_candidates = len(candidate_string)
+
+        # candidate_indices[c] is the index of candidate c in the candidate string
+        self.candidate_indices = {candidate: index for index, candidate in enumerate(candidate_string)}
+
+        # int8 is enough for up to 127 candidates, which covers every election we run
+        self.dtype = np.int8 if self.num_candidates <= np.iinfo(np.int8).max else np.int16
+
+        self.ballots = np.asarray(ballots, dtype=self.dtype).reshape(-1, self.num_candidates)
+
+        # ranks[i][c] is the position of candidate c in the preference order of agent i
+        self.ranks = np.empty_like(self.ballots)
+        np.put_along_axis(self.ranks, self.ballots.astype(np.intp),
+                          np.arange(self.num_candidates, dtype=self.dtype)[np.newaxis, :], axis=1)
+
+        self.tie_order = get_tie_order(candidate_string)
+
+        self.position_counts = None
+        self.ballot_types = None
+
+    @classmethod
+    def from_strings(cls, candidate_string, preference_strings):
+        """
+        Creates a preference profile from preference strings
+
+        :param candidate_string: A string of candidates, for example: "ABCDEFG"
+        :param preference_strings: A list of strings indicating the preferences of each agent in order
+        :return: Returns a preference profile object
+        """
+        lookup = {candidate: index for index, candidate in enumerate(candidate_string)}
+
+        ballots = [[lookup[candidate] for candidate in preferences] for preferences in preference_strings]
+
+        return cls(candidate_string, np.array(ballots, dtype=np.intp).reshape(-1, len(candidate_string)))
+
+    def __len__(self):
+        """
+        The length of a profile is its number of agents
+
+        :return: Returns an integer indicating the number of agents in the profile
+        """
+        return self.ballots.shape[0]
+
+    def get_preference_list(self, index):
+        """
+        Gets the preferences of an agent as a list of candidates
+
+        :param index: An integer indicating the index of the agent in the profile
+        :return: Returns a list of candidate strings in preference order
+        """
+        return [self.candidate_string[candidate] for candidate in self.ballots[index]]
+
+    def get_preference_string(self, index):
+        """
+        Gets the preferences of an agent as a string
+
+        :param index: An integer indicating the index of the agent in the profile
+        :return: Returns a string of candidates in preference order
+        """
+        return "".join(self.get_preference_list(index))
+
+    def get_preference_strings(self):
+        """
+        :return: Returns a list with the preference string of every agent in the profile
+        """
+        return [self.get_preference_string(i) for i in range(len(self))]
+
+    def get_position_counts(self):
+        """
+        Counts how many agents put each candidate in each position. Any positional tally of the profile is the product
+        of a score vector with this matrix, so it is only computed once per profile
+
+        :return: Returns a (positions x candidates) numpy array, where entry [p][c] is the number of agents that have
+        candidate c in position p
+        """
+        if self.position_counts is None:
+            m = self.num_candidates
+            positions = np.arange(m, dtype=np.intp)[np.newaxis, :]
+            flat = positions * m + self.ballots
+            self.position_counts = np.bincount(flat.ravel(), minlength=m * m).reshape(m, m)
+
+        return self.position_counts
+
+    def get_ballot_types(self):
+        """
+        Groups the agents of the profile by ballot type. Agents with the same ballot have the same happiness and the
+        same tactical options, so these only have to be computed once per ballot type, of which there are at most m!
+
+        :return: Returns a tuple of a (types x candidates) numpy array with every distinct ballot, a numpy array with
+        the index of the first agent of every type, a numpy array with the type of every agent, and a numpy array with
+        the number of agents of every type
+        """
+        if self.ballot_types is None:
+            self.ballot_types = np.unique(self.ballots, axis=0, return_index=True, return_inverse=True,
+                                          return_counts=True)
+
+        return self.ballot_types
+
+    def get_anonymous_signature(self):
+        """
+        Gets the anonymous signature of the profile, which only keeps how many agents cast each ballot. Profiles that
+        only differ in the order of their agents have the same signature
+
+        :return: Returns a hashable tuple of the candidate string, and a (ballot, count) pair per ballot type in sorted
+        order
+        """
+        ballot_types, _, _, counts = self.get_ballot_types()
+
+        return self.candidate_string, tuple(zip(map(tuple, ballot_types.tolist()), counts.tolist()))
+
+    def get_winner_index(self, tally):
+        """
+        Returns the index of the winning candidate, with ties broken alphabetically as in get_winner
+
+        :param tally: A numpy array with the votes of each candidate
+        :return: Returns an integer indicating the index of the winner in the candidate string
+        """
+        return get_winner_indices(tally, self.tie_order).item()
+
+    def get_happinesses(self, tally):
+        """
+        Computes the happiness of all agents at once for a voting outcome, see get_happiness_arrays
+
+        :param tally: A numpy array with the votes of each candidate
+        :return: Returns a dictionary with a numpy array of happiness values per type of happiness
+        """
+        return get_happiness_arrays(self.ballots, self.ranks, tally, self.tie_order)
+
+    def to_vector(self, results):
+        """
+        Converts a dictionary of results into a vector, ordered as the candidate string
+
+        :param results: A dictionary of results
+        :return: Returns a numpy array with the votes of each candidate
+        """
+        return np.array([results[candidate] for candidate in self.candidate_string])
+
+    def to_results(self, vector):
+        """
+        Converts a vector of votes, ordered as the candidate string, into a dictionary of results
+
+        :param vector: A numpy array with the votes of each candidate
+        :return: Returns a dictionary of results
+        """
+        return dict(zip(self.candidate_string, vector.tolist()))
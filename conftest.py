@@ -0,0 +1 @@
+# The tests import the modules of the repository from its root, like tva.py does
@@ -0,0 +1,83 @@
+import numpy as np
+
+
+def stack_ballots(rngs, n_voters, n_candidates):
+    """
+    Generates the preferences of many elections, each from its own random generator. Every election gets the same
+    preferences as a TVA created with that generator, so trials of a batched sweep can still be re-run one by one
+
+    Shuffling one (trials x voters x candidates) tensor with a single generator would be faster, but would tie the
+    preferences of every trial to the size of the batch, so the trials are shuffled one by one from their own streams
+
+    :param rngs: A list of numpy random Generators, one per election
+    :param n_voters: An integer indicating the number of voters per election
+    :param n_candidates: An integer indicating the number of candidates per election
+    :return: Returns a (trials x voters x candidates) numpy array with the candidate indices in preference order
+    """
+    row = np.tile(np.arange(n_candidates), (n_voters, 1))
+
+    return np.stack([rng.permuted(row, axis=1) for rng in rngs])
+
+
+def get_rank_tensor(ballots):
+    """
+    Inverts ballots into ranks, along the last axis
+
+    :param ballots: A (... x candidates) numpy array with the candidate indices in preference order
+    :return: Returns a numpy array of the same shape with the position of every candidate
+    """
+    ranks = np.empty_like(ballots)
+    positions = np.broadcast_to(np.arange(ballots.shape[-1], dtype=ballots.dtype), ballots.shape)
+    np.put_along_axis(ranks, ballots.astype(np.intp), positions, axis=-1)
+
+    return ranks
+
+
+def get_position_count_tensor(ballots):
+    """
+    Counts how many agents put each candidate in each position, for many elections at once
+
+    :param ballots: A (trials x voters x candidates) numpy array with the candidate indices in preference order
+    :return: Returns a (trials x positions x candidates) numpy array, see PreferenceProfile.get_position_counts
+    """
+    trials, _, m = ballots.shape
+    offsets = np.arange(trials, dtype=np.intp)[:, np.newaxis, np.newaxis] * m * m
+    positions = np.arange(m, dtype=np.intp)[np.newaxis, np.newaxis, :] * m
+    flat = offsets + positions + ballots
+
+    return np.bincount(flat.ravel(), minlength=trials * m * m).reshape(trials, m, m)
+
+
+def tally_ballots(scores, ballots):
+    """
+    Tallies the votes of many elections in one vectorized pass, as the product of the score vector with the position
+    counts of every election
+
+    :param scores: A numpy array with the score vector of the voting scheme
+    :param ballots: A (trials x voters x candidates) numpy array with the candidate indices in preference order
+    :return: Returns a (trials x candidates) numpy array with the votes of each candidate
+    """
+    return scores @ get_position_count_tensor(ballots)
+
+
+def summarize_tactical_happinesses(happinesses, best_happinesses):
+    """
+    Reduces the happiness of every agent, before and after their best tactical vote, to the tactical voting risk and
+    the average happiness increase of every election. Agents without tactical options are NaN in best_happinesses
+
+    :param happinesses: A dictionary with a (trials x voters) numpy array of happiness values per type of happiness
+    :param best_happinesses: A dictionary with a (trials x voters) numpy array of the best tactical happiness
+    :return: Returns a dictionary with, per type of happiness, a tuple of (trials) numpy arrays (risk, increase)
+    """
+    summary = {}
+
+    for key in happinesses:
+        has_option = ~np.isnan(best_happinesses[key])
+        n_options = has_option.sum(axis=-1)
+
+        increases = np.where(has_option, best_happinesses[key] - happinesses[key], 0).sum(axis=-1)
+        average_increase = np.divide(increases, n_options, out=np.zeros(increases.shape), where=n_options > 0)
+
+        summary[key] = (n_options / happinesses[key].shape[-1], average_increase)
+
+    return summary
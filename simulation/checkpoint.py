@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+
+from simulation.random_streams import create_sweep_seed
+
+
+ROOT_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Source folders whose code determines the results of a sweep
+SOURCE_FOLDERS = ["agents", "simulation", "strategies", "voting"]
+
+code_version = None
+
+
+def get_code_version():
+    """
+    Gets the version of the code that computes sweep results, as a hash of the contents of all its source files. Any
+    change to the code gives a new version, which invalidates all checkpoints made with the old code
+
+    :return: Returns a string with the hexadecimal hash of the source files
+    """
+    global code_version
+
+    if code_version is None:
+        paths = [os.path.join(ROOT_FOLDER, "tva.py")]
+
+        for folder in SOURCE_FOLDERS:
+            for directory, _, files in os.walk(os.path.join(ROOT_FOLDER, folder)):
+                paths += [os.path.join(directory, file) for file in files if file.endswith(".py")]
+
+        digest = hashlib.sha256()
+        for path in sorted(paths):
+            digest.update(os.path.relpath(path, ROOT_FOLDER).encode())
+            with open(path, "rb") as source_file:
+                digest.update(source_file.read())
+
+        code_version = digest.hexdigest()
+
+    return code_version
+
+
+def get_cell_key(voting_scheme, n_candidates, n_voters, tests, seed, show_atva_features, stopping_rule=None,
+                 exact=False):
+    """
+    Gets the content hash of a grid cell of a sweep. Two cells with the same key have the same results
+
+    :param voting_scheme: A string indicating the type of voting
+    :param n_candidates: An integer indicating the number of candidates
+    :param n_voters: An integer indicating the number of voters
+    :param tests: An integer indicating the number of trials of the cell
+    :param seed: An integer indicating the root seed of the sweep
+    :param show_atva_features: A boolean indicating whether the advanced TVA is run
+    :param stopping_rule: A dictionary with the parameters of the early stopping rule of the sweep, or None if every
+    cell runs all its trials
+    :param exact: A boolean indicating whether the cell is computed exactly instead of sampled
+    :return: Returns a string with the hexadecimal hash of the cell
+    """
+    cell = {"voting_scheme": voting_scheme, "n_candidates": n_candidates, "n_voters": n_voters, "tests": tests,
+            "seed": seed, "show_atva_features": show_atva_features, "stopping_rule": stopping_rule,
+            "exact": exact, "code_version": get_code_version()}
+
+    return hashlib.sha256(json.dumps(cell, sort_keys=True).encode()).hexdigest()
+
+
+class CellCheckpoint:
+    """
+    Class for the checkpoints of a sweep
+
+    Every grid cell is persisted under its content hash as soon as it completes, so that a restarted or repeated sweep
+    only has to compute the cells that are missing or were invalidated
+    """
+
+    def __init__(self, folder):
+        """
+        Constructor for the checkpoints of a sweep
+
+        :param folder: A string indicating the folder in which the checkpoints are saved
+        """
+        self.folder = folder
+
+        os.makedirs(folder, exist_ok=True)
+
+    def get_path(self, key):
+        """
+        :param key: A string indicating the content hash of a cell
+        :return: Returns the path of the checkpoint of the cell
+        """
+        return os.path.join(self.folder, key + ".json")
+
+    def load(self, key):
+        """
+        Loads the checkpoint of a cell
+
+        :param key: A string indicating the content hash of a cell
+        :return: Returns the dictionary of partial results of the cell, or None if the cell was not completed yet
+        """
+        if not os.path.exists(self.get_path(key)):
+            return None
+
+        with open(self.get_path(key)) as checkpoint_file:
+            return json.load(checkpoint_file)
+
+    def save(self, key, totals):
+        """
+        Saves the checkpoint of a completed cell. The checkpoint is written to a temporary file first, so a sweep that
+        dies while saving never leaves a broken checkpoint behind
+
+        :param key: A string indicating the content hash of a cell
+        :param totals: A dictionary of partial results of all trials of the cell
+        :return: void
+        """
+        temporary_path = self.get_path(key) + ".tmp"
+
+        with open(temporary_path, "w") as checkpoint_file:
+            json.dump(totals, checkpoint_file)
+
+        os.replace(temporary_path, self.get_path(key))
+
+    def get_seed(self, seed=None):
+        """
+        Gets the root seed of the sweep. Without a seed, the seed of an earlier run in the same folder is reused, so
+        that an interrupted sweep resumes its cells instead of starting over under fresh entropy. A seed is only drawn,
+        and saved next to the checkpoints, the first time
+
+        :param seed: An integer seed, or None to reuse or draw the seed of the folder
+        :return: Returns an integer seed
+        """
+        if seed is not None:
+            return seed
+
+        seed_path = os.path.join(self.folder, "seed.json")
+
+        if os.path.exists(seed_path):
+            with open(seed_path) as seed_file:
+                return json.load(seed_file)
+
+        seed = create_sweep_seed()
+
+        with open(seed_path + ".tmp", "w") as seed_file:
+            json.dump(seed, seed_file)
+
+        os.replace(seed_path + ".tmp", seed_path)
+
+        return seed
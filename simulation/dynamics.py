@@ -0,0 +1,194 @@
+import numpy as np
+
+from agents.agent import get_winner
+
+
+# Orders in which the agents of an election can best-respond. In a round-robin round the agents move one after the
+# other in a fixed order, in a random round in a new random order, and in a simultaneous round all agents respond to
+# the same ballots and move at once
+BEST_RESPONSE_ORDERS = ("round-robin", "random", "simultaneous")
+
+
+def update_results(results, old_ballot, new_ballot, scores):
+    """
+    Updates the results of an election in place when an agent changes their ballot, by taking the votes of the old
+    ballot out and adding the votes of the new ballot
+
+    :param results: A dictionary of results
+    :param old_ballot: A tuple of candidates in the order of the old ballot
+    :param new_ballot: A tuple of candidates in the order of the new ballot
+    :param scores: A list with the score vector of the voting scheme
+    :return: void
+    """
+    for candidate, score in zip(old_ballot, scores):
+        results[candidate] -= score
+
+    for candidate, score in zip(new_ballot, scores):
+        results[candidate] += score
+
+
+def get_best_response(scheme, snapshot, agent, ballot, results, scores, key, memo):
+    """
+    Gets the ballot an agent casts in reply to the ballots of all other agents. The agent compares the ballot they
+    cast now, their true preferences, and their best tactical option against the true preferences, and keeps the ballot
+    they cast now unless another one makes them strictly happier
+
+    The reply only depends on the true preferences of the agent, the ballot they cast now and the tallied votes of all
+    other agents, so it is only computed once per combination of these
+
+    :param scheme: A voting scheme object
+    :param snapshot: An election snapshot of the election with the true preferences of all agents
+    :param agent: The agent object that replies, with their true preferences
+    :param ballot: A tuple of candidates in the order of the ballot the agent casts now
+    :param results: A dictionary of results of the ballots that are cast now
+    :param scores: A list with the score vector of the voting scheme
+    :param key: A string indicating the type of happiness the agent maximizes
+    :param memo: A dictionary of replies, shared by all replies of the same election
+    :return: Returns a tuple of candidates in the order of the ballot the agent replies with
+    """
+    remainder = dict(results)
+    for candidate, score in zip(ballot, scores):
+        remainder[candidate] -= score
+
+    memo_key = (agent.ballot, ballot, tuple(remainder.values()))
+    best_ballot = memo.get(memo_key)
+
+    if best_ballot is not None:
+        return best_ballot
+
+    best_ballot = ballot
+    best_happiness = agent.get_happiness(results)[key]
+
+    sincere_results = scheme.tally_preference_list(remainder, list(agent.ballot))
+    sincere_happiness = agent.get_happiness(sincere_results)[key]
+
+    if sincere_happiness > best_happiness:
+        best_ballot = agent.ballot
+        best_happiness = sincere_happiness
+
+    # Tactical options are searched against the tallied votes of all other agents plus the true preferences
+    best_option = scheme.best_tactical_option(agent, snapshot.with_results(sincere_results), key)
+
+    if best_option is not None and best_option[3][key] > best_happiness:
+        best_ballot = tuple(best_option[0])
+
+    memo[memo_key] = best_ballot
+
+    return best_ballot
+
+
+def run_best_response_dynamics(election, key="H_p", order="round-robin", max_rounds=1000, rng=None):
+    """
+    Runs iterated best-response dynamics on an election. Starting from the true preferences, the agents repeatedly
+    reply to the ballots of all other agents with their best response, see get_best_response, in rounds in which every
+    agent gets one turn. The results are updated incrementally with every changed ballot, instead of tallying all
+    ballots again
+
+    The dynamics stop at an equilibrium, which is a round in which no agent changes their ballot, or when the ballots
+    at the end of a round were already cast at the end of an earlier round. With a round-robin or simultaneous order
+    the rounds are deterministic, so the dynamics then cycle forever. With a random order a repeated profile is not a
+    cycle, and the dynamics only stop at an equilibrium or after max_rounds
+
+    :param election: A TVA object that was run
+    :param key: A string indicating the type of happiness the agents maximize
+    :param order: A string indicating the order in which the agents reply, one of BEST_RESPONSE_ORDERS
+    :param max_rounds: An integer indicating the maximum number of rounds
+    :param rng: A numpy random Generator for the random order, a fresh one is created if None
+    :return: Returns a dictionary with whether the dynamics converged, the number of rounds and ballot changes, the
+    length of the cycle in rounds (None without cycle), the final ballots, results and winner, the overall happiness
+    of the final results, and the number of agents that do not cast their true preferences at the end
+    """
+    if order not in BEST_RESPONSE_ORDERS:
+        raise Exception(f"{order} is not an order of best-response dynamics")
+
+    if rng is None:
+        rng = np.random.default_rng()
+
+    scheme = election.scheme()
+    snapshot = election.get_snapshot()
+    agents = snapshot.get_agents()
+    scores = scheme.score_vector(len(election.candidates))
+
+    results = dict(election.results)
+    ballots = [agent.ballot for agent in agents]
+
+    memo = {}
+    seen = {tuple(ballots): 0}
+
+    converged = False
+    cycle_length = None
+    moves = 0
+    rounds = 0
+
+    while rounds < max_rounds:
+        rounds += 1
+        changes = 0
+
+        if order == "simultaneous":
+
+            responses = [get_best_response(scheme, snapshot, agent, ballot, results, scores, key, memo)
+                         for agent, ballot in zip(agents, ballots)]
+
+            for i, response in enumerate(responses):
+                if response != ballots[i]:
+                    update_results(results, ballots[i], response, scores)
+                    ballots[i] = response
+                    changes += 1
+
+        else:
+
+            sequence = range(len(agents)) if order == "round-robin" else rng.permutation(len(agents)).tolist()
+
+            for i in sequence:
+                response = get_best_response(scheme, snapshot, agents[i], ballots[i], results, scores, key, memo)
+
+                if response != ballots[i]:
+                    update_results(results, ballots[i], response, scores)
+                    ballots[i] = response
+                    changes += 1
+
+        moves += changes
+
+        if changes == 0:
+            converged = True
+            break
+
+        profile_key = tuple(ballots)
+
+        if order != "random" and profile_key in seen:
+            cycle_length = rounds - seen[profile_key]
+            break
+
+        seen[profile_key] = rounds
+
+    return {"converged": converged,
+            "rounds": rounds,
+            "moves": moves,
+            "cycle_length": cycle_length,
+            "ballots": ballots,
+            "results": results,
+            "winner": get_winner(results),
+            "overall_happiness": snapshot.with_results(results).get_overall_happiness(),
+            "manipulators": sum(ballot != agent.ballot for agent, ballot in zip(agents, ballots))}
+
+
+def summarize_dynamics(outcomes):
+    """
+    Summarizes the best-response dynamics of many elections
+
+    :param outcomes: A list of dictionaries, as returned by run_best_response_dynamics
+    :return: Returns a dictionary with the fraction of elections that converged and that cycled, the average number of
+    rounds and ballot changes, the average length of the cycles, and the average overall happiness at the end per type
+    of happiness
+    """
+    converged = np.array([outcome["converged"] for outcome in outcomes], dtype=bool)
+    cycle_lengths = np.array([outcome["cycle_length"] for outcome in outcomes if outcome["cycle_length"] is not None])
+
+    return {"convergence_rate": converged.mean().item(),
+            "cycle_rate": len(cycle_lengths) / len(outcomes),
+            "average_rounds": np.mean([outcome["rounds"] for outcome in outcomes]).item(),
+            "average_moves": np.mean([outcome["moves"] for outcome in outcomes]).item(),
+            "average_cycle_length": cycle_lengths.mean().item() if len(cycle_lengths) > 0 else None,
+            "average_overall_happiness": {key: np.mean([outcome["overall_happiness"][key]
+                                                        for outcome in outcomes]).item()
+                                          for key in ("H_p", "H_si")}}
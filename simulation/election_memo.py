@@ -0,0 +1,32 @@
+from voting.lru_cache import LRUCache
+
+
+class ElectionMemo(LRUCache):
+    """
+    Class for a memo of election results
+
+    The names and the order of the agents never affect the results of an election, so elections whose ballots are the
+    same multiset have the same results, risks and advanced TVA outcomes. With few candidates, random sweeps generate
+    the same anonymous profiles over and over, so the results of create_and_run_election are kept across elections and
+    grid cells, and evicted in least recently used order once the memo is full
+    """
+
+    def __init__(self, max_size=65536):
+        """
+        Constructor for the election memo
+
+        :param max_size: An integer indicating the maximum number of elections to keep
+        """
+        super().__init__(max_size)
+
+    @staticmethod
+    def get_key(voting_scheme, is_advanced, profile):
+        """
+        Creates the memo key of an election
+
+        :param voting_scheme: A string indicating the type of voting
+        :param is_advanced: A boolean indicating whether the advanced TVA is run
+        :param profile: A preference profile object with the preferences of the agents
+        :return: Returns a hashable tuple of (voting scheme, advanced TVA, anonymous signature of the profile)
+        """
+        return voting_scheme, is_advanced, profile.get_anonymous_signature()
@@ -0,0 +1,111 @@
+from itertools import islice
+from math import comb, factorial
+
+import numpy as np
+
+from agents.permutation_table import get_permutation_table
+
+
+def count_anonymous_profiles(n_candidates, n_voters):
+    """
+    Counts the anonymous profiles of an election, which are the multisets of n_voters ballots out of the m! possible
+    ballots. Under impartial culture, every metric that does not depend on the order of the agents has the same value
+    for all profiles with the same multiset of ballots
+
+    :param n_candidates: An integer indicating the number of candidates
+    :param n_voters: An integer indicating the number of voters
+    :return: Returns an integer indicating the number of anonymous profiles
+    """
+    return comb(factorial(n_candidates) + n_voters - 1, n_voters)
+
+
+def get_profile_weight(ballot_types, n_voters):
+    """
+    Gets the multinomial weight of an anonymous profile, which is the number of ordered profiles with the same
+    multiset of ballots
+
+    :param ballot_types: A sorted tuple with the ballot type of every agent
+    :param n_voters: An integer indicating the number of voters
+    :return: Returns an integer indicating the weight of the profile
+    """
+    weight = factorial(n_voters)
+
+    for count in np.unique(ballot_types, return_counts=True)[1].tolist():
+        weight //= factorial(count)
+
+    return weight
+
+
+def get_multiset(n_types, size, index):
+    """
+    Gets the multiset with a given index among all multisets of a size, in the order of
+    itertools.combinations_with_replacement, without enumerating the multisets before it. The multisets that start with
+    a value are counted with the combinatorial number system, and skipped all at once
+
+    :param n_types: An integer indicating the number of values, which are 0, ..., n_types - 1
+    :param size: An integer indicating the size of the multisets
+    :param index: An integer indicating the index of the multiset
+    :return: Returns a list of values in non-decreasing order
+    """
+    multiset = []
+    value = 0
+
+    for position in range(size):
+        remaining = size - position - 1
+
+        # Number of multisets that have this value at this position, and only larger values after it
+        while index >= comb(n_types - value + remaining - 1, remaining):
+            index -= comb(n_types - value + remaining - 1, remaining)
+            value += 1
+
+        multiset.append(value)
+
+    return multiset
+
+
+def iterate_multisets(n_types, size, first_index):
+    """
+    Iterates over the multisets of a size in the order of itertools.combinations_with_replacement, starting at a given
+    index, see get_multiset
+
+    :param n_types: An integer indicating the number of values, which are 0, ..., n_types - 1
+    :param size: An integer indicating the size of the multisets
+    :param first_index: An integer indicating the index of the first multiset
+    :return: Yields tuples of values in non-decreasing order
+    """
+    multiset = get_multiset(n_types, size, first_index)
+
+    while True:
+        yield tuple(multiset)
+
+        # The last position that can still be increased is increased, and all positions after it take its value
+        position = size - 1
+        while position >= 0 and multiset[position] == n_types - 1:
+            position -= 1
+
+        if position < 0:
+            return
+
+        multiset[position:] = [multiset[position] + 1] * (size - position)
+
+
+def get_anonymous_profiles(n_candidates, n_voters, first_profile, n_profiles):
+    """
+    Gets a range of the anonymous profiles of an election, in a fixed order, so the profiles can be split into chunks
+    like the trials of a random sweep
+
+    :param n_candidates: An integer indicating the number of candidates
+    :param n_voters: An integer indicating the number of voters
+    :param first_profile: An integer indicating the index of the first profile
+    :param n_profiles: An integer indicating the number of profiles
+    :return: Returns a tuple of a (profiles x voters x candidates) numpy array with the candidate indices in preference
+    order, and a list with the integer weight of every profile
+    """
+    ballot_table = get_permutation_table(n_candidates).permutations
+
+    # The ballot types of a profile are Lehmer codes, which index the rows of the permutation table
+    profiles = list(islice(iterate_multisets(len(ballot_table), n_voters, first_profile), n_profiles))
+
+    weights = [get_profile_weight(ballot_types, n_voters) for ballot_types in profiles]
+
+    return ballot_table[np.array(profiles, dtype=np.intp).reshape(-1, n_voters)], weights
@@ -0,0 +1,44 @@
+import numpy as np
+
+
+def create_sweep_seed(seed=None):
+    """
+    Creates the root seed of a sweep. If no seed is given, fresh entropy is drawn once, so that it can be reported and
+    every trial of the sweep can still be reproduced afterwards
+
+    :param seed: An integer seed, or None
+    :return: Returns an integer seed
+    """
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+
+    return seed
+
+
+def get_trial_seed_sequence(seed, n_candidates, n_voters, trial):
+    """
+    Gets the seed sequence of a single trial of a sweep. Trial streams are children of the root seed sequence,
+    addressed by their spawn key (n_candidates, n_voters, trial) instead of the order in which they are spawned. This
+    gives every grid cell and trial an independent stream, that does not depend on which worker runs it
+
+    :param seed: An integer indicating the root seed of the sweep
+    :param n_candidates: An integer indicating the number of candidates
+    :param n_voters: An integer indicating the number of voters
+    :param trial: An integer indicating the index of the trial in its grid cell
+    :return: Returns a numpy SeedSequence object
+    """
+    return np.random.SeedSequence(seed, spawn_key=(n_candidates, n_voters, trial))
+
+
+def get_trial_generator(seed, n_candidates, n_voters, trial):
+    """
+    Gets the random generator of a single trial of a sweep. Passing it to create_and_run_election re-runs that trial
+    in isolation
+
+    :param seed: An integer indicating the root seed of the sweep
+    :param n_candidates: An integer indicating the number of candidates
+    :param n_voters: An integer indicating the number of voters
+    :param trial: An integer indicating the index of the trial in its grid cell
+    :return: Returns a numpy Generator object
+    """
+    return np.random.default_rng(get_trial_seed_sequence(seed, n_candidates, n_voters, trial))
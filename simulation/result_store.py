@@ -0,0 +1,138 @@
+import os
+
+import numpy as np
+
+from simulation.streaming_stats import get_mean, get_half_width
+
+
+# Metric columns of the result store, one value per (voting scheme, n_candidates, n_voters) row. The names match the
+# heatmaps of mas_visualization.ipynb
+METRIC_COLUMNS = [
+    "basic_average_overall_happiness_percentage_my_preference",
+    "basic_average_overall_happiness_percentage_social_index",
+    "average_tactical_voting_risk_percentage_my_preference",
+    "average_tactical_voting_risk_percentage_social_index",
+    "basic_average_happiness_increase_percentage_my_preference",
+    "basic_average_happiness_increase_percentage_social_index",
+    "conc_average_overall_happiness_percentage_my_preference",
+    "conc_average_overall_happiness_percentage_social_index",
+    "conc_average_overall_happiness_increases_percentage_my_preference",
+    "conc_average_overall_happiness_increases_percentage_social_index",
+    "counter_average_voting_overall_percentage_my_preference",
+    "counter_average_voting_overall_percentage_social_index",
+    "counter_average_voting_increases_percentage_my_preference",
+    "counter_average_voting_increases_percentage_social_index",
+]
+
+# Every metric column has a column with the half-width of its confidence interval next to it
+CI_SUFFIX = "_ci"
+
+CI_COLUMNS = [column + CI_SUFFIX for column in METRIC_COLUMNS]
+
+KEY_COLUMNS = ["voting_scheme", "n_candidates", "n_voters", "tests"]
+
+HAPPINESS_SUFFIXES = {"H_p": "percentage_my_preference", "H_si": "percentage_social_index"}
+
+
+def get_cell_averages(totals, confidence=0.95):
+    """
+    Turns the partial results of a grid cell into the average of every metric column, and the half-width of its
+    confidence interval. Counter voting metrics are averaged over the elections in which counter voting happened, and
+    are NaN if it never did. The averages of exact cells are expectations, so their intervals have a half-width of 0
+
+    :param totals: A dictionary of partial results of all trials of the grid cell, created by create_totals
+    :param confidence: A float indicating the confidence level of the intervals
+    :return: Returns a dictionary with a float per metric column and per confidence interval column
+    """
+    averages = {}
+
+    for column in METRIC_COLUMNS:
+        statistics = totals["statistics"][column]
+        averages[column] = get_mean(statistics)
+        if statistics["count"] == 0:
+            averages[column + CI_SUFFIX] = np.nan
+        elif totals["exact"]:
+            averages[column + CI_SUFFIX] = 0.0
+        else:
+            averages[column + CI_SUFFIX] = get_half_width(statistics, confidence)
+
+    return averages
+
+
+def load_results(path):
+    """
+    Loads the result store of a sweep with a single read
+
+    :param path: A string indicating the path of the .npz result store
+    :return: Returns a dictionary with a numpy array per column, which is empty if the store does not exist yet
+    """
+    if not os.path.exists(path):
+        return {"voting_scheme": np.array([], dtype=str),
+                "n_candidates": np.array([], dtype=np.int64),
+                "n_voters": np.array([], dtype=np.int64),
+                "tests": np.array([], dtype=np.int64),
+                **{column: np.array([], dtype=np.float64) for column in METRIC_COLUMNS + CI_COLUMNS}}
+
+    with np.load(path) as store:
+        results = {column: store[column] for column in KEY_COLUMNS + METRIC_COLUMNS}
+
+        # Stores written before confidence intervals were saved have no interval columns
+        for column in CI_COLUMNS:
+            results[column] = store[column] if column in store else np.full(len(store["tests"]), np.nan)
+
+        return results
+
+
+def save_results(path, rows):
+    """
+    Saves rows of a sweep into the result store. Rows of the same (voting scheme, n_candidates, n_voters) that are
+    already in the store are replaced, all other rows are kept. The store is written to a temporary file first, so an
+    interrupted write never leaves a broken store behind
+
+    :param path: A string indicating the path of the .npz result store
+    :param rows: A list of dictionaries, each with a value for every key, metric and confidence interval column
+    :return: void
+    """
+    columns = load_results(path)
+
+    new_keys = {(row["voting_scheme"], row["n_candidates"], row["n_voters"]) for row in rows}
+    keep = np.array([key not in new_keys for key in zip(columns["voting_scheme"].tolist(),
+                                                         columns["n_candidates"].tolist(),
+                                                         columns["n_voters"].tolist())], dtype=bool)
+
+    store = {}
+    for column in KEY_COLUMNS + METRIC_COLUMNS + CI_COLUMNS:
+        store[column] = np.concatenate([columns[column][keep].tolist(), [row[column] for row in rows]])
+
+    store["voting_scheme"] = store["voting_scheme"].astype(str)
+    for column in ["n_candidates", "n_voters", "tests"]:
+        store[column] = store[column].astype(np.int64)
+    for column in METRIC_COLUMNS + CI_COLUMNS:
+        store[column] = store[column].astype(np.float64)
+
+    temporary_path = path + ".tmp.npz"
+    np.savez(temporary_path, **store)
+    os.replace(temporary_path, path)
+
+
+def get_heatmap(results, voting_scheme, column, candidates, voters):
+    """
+    Gets a metric column of one voting scheme as a (candidates x voters) matrix, for plotting heatmaps
+
+    :param results: A dictionary of columns, as returned by load_results
+    :param voting_scheme: A string indicating the type of voting
+    :param column: A string indicating the metric column
+    :param candidates: A list of candidate counts, one per row of the heatmap
+    :param voters: A list of voter counts, one per column of the heatmap
+    :return: Returns a numpy array, with NaN for cells that are not in the store
+    """
+    heatmap = np.full((len(candidates), len(voters)), np.nan)
+    rows = results["voting_scheme"] == voting_scheme
+
+    for n_candidates, n_voters, value in zip(results["n_candidates"][rows].tolist(),
+                                             results["n_voters"][rows].tolist(),
+                                             results[column][rows].tolist()):
+        if n_candidates in candidates and n_voters in voters:
+            heatmap[candidates.index(n_candidates)][voters.index(n_voters)] = value
+
+    return heatmap
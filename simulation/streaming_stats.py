@@ -0,0 +1,87 @@
+from statistics import NormalDist
+
+import numpy as np
+
+
+def create_statistics():
+    """
+    Creates the running statistics of a metric, before any value was observed
+
+    :return: Returns a dictionary with the count, mean and sum of squared deviations (m2) of the observed values
+    """
+    return {"count": 0, "mean": 0.0, "m2": 0.0}
+
+
+def merge_statistics(statistics, other_statistics):
+    """
+    Merges the running statistics of two disjoint sets of values, with the parallel form of Welford's algorithm. This
+    is exact for any split of the values, so chunks of trials can be summarised separately and merged afterwards
+
+    :param statistics: A dictionary of running statistics, which is updated in place
+    :param other_statistics: A dictionary of running statistics of other values
+    :return: void
+    """
+    count = statistics["count"] + other_statistics["count"]
+
+    if other_statistics["count"] == 0:
+        return
+
+    delta = other_statistics["mean"] - statistics["mean"]
+
+    statistics["mean"] += delta * other_statistics["count"] / count
+    statistics["m2"] += other_statistics["m2"] + delta * delta * statistics["count"] * other_statistics["count"] / count
+    statistics["count"] = count
+
+
+def add_values(statistics, values, weights=None):
+    """
+    Adds observed values of a metric to its running statistics
+
+    :param statistics: A dictionary of running statistics, which is updated in place
+    :param values: A number, or a numpy array of numbers
+    :param weights: A number, or a list of integers, with the number of times each value was observed, or None if
+    every value was observed once
+    :return: void
+    """
+    values = np.asarray(values, dtype=np.float64).ravel()
+
+    if len(values) == 0:
+        return
+
+    if weights is None:
+        mean = values.mean()
+        merge_statistics(statistics, {"count": len(values), "mean": mean.item(),
+                                      "m2": ((values - mean) ** 2).sum().item()})
+        return
+
+    weights = np.atleast_1d(weights).tolist()
+    float_weights = np.array(weights, dtype=np.float64)
+
+    mean = (float_weights * values).sum() / float_weights.sum()
+    merge_statistics(statistics, {"count": sum(weights), "mean": mean.item(),
+                                  "m2": (float_weights * (values - mean) ** 2).sum().item()})
+
+
+def get_mean(statistics):
+    """
+    :param statistics: A dictionary of running statistics
+    :return: Returns the mean of the observed values, or NaN if no value was observed
+    """
+    return statistics["mean"] if statistics["count"] > 0 else np.nan
+
+
+def get_half_width(statistics, confidence=0.95):
+    """
+    Gets the half-width of the normal confidence interval of the mean of the observed values
+
+    :param statistics: A dictionary of running statistics
+    :param confidence: A float indicating the confidence level of the interval
+    :return: Returns the half-width of the interval, which is infinite if less than two values were observed
+    """
+    if statistics["count"] < 2:
+        return np.inf
+
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    variance = statistics["m2"] / (statistics["count"] - 1)
+
+    return z * np.sqrt(variance / statistics["count"]).item()
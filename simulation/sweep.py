@@ -0,0 +1,205 @@
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+
+from simulation.result_store import HAPPINESS_SUFFIXES, METRIC_COLUMNS
+from simulation.streaming_stats import create_statistics, add_values, merge_statistics, get_half_width
+
+
+# The tactical voting risks are fractions of the agents, while all other metrics are percentages. Their confidence
+# intervals are scaled to percentage points as well, so that one precision applies to every metric
+PERCENTAGE_SCALES = {"average_tactical_voting_risk_percentage_my_preference": 100,
+                     "average_tactical_voting_risk_percentage_social_index": 100}
+
+
+def create_totals():
+    """
+    Creates the partial results of a grid cell of the test sweep, before any election was run. Every metric column
+    keeps running statistics of its value per election, so that its mean and confidence interval can be read at any
+    point of the sweep
+
+    Cells that are computed exactly instead of by sampling, see run_exact_chunk, weigh every election by the number
+    of random profiles it stands for
+
+    :return: Returns a dictionary with the number of elections, whether they were enumerated exactly, and the running
+    statistics of every metric column
+    """
+    return {"tests": 0,
+            "exact": False,
+            "statistics": {column: create_statistics() for column in METRIC_COLUMNS}}
+
+
+def accumulate_election_results(totals, election_results, weight=None):
+    """
+    Adds the results of a single election, as returned by create_and_run_election, to the partial results of a grid
+    cell. Counter voting metrics are only observed in elections in which counter voting happened
+
+    :param totals: A dictionary of partial results, created by create_totals
+    :param election_results: A tuple of election results, as returned by create_and_run_election
+    :param weight: An integer indicating the number of profiles the election stands for, or None for a single one
+    :return: void
+    """
+    totals["tests"] += 1
+    statistics = totals["statistics"]
+
+    for key, suffix in HAPPINESS_SUFFIXES.items():
+        add_values(statistics["basic_average_overall_happiness_" + suffix], election_results[0][key], weight)
+        add_values(statistics["basic_average_happiness_increase_" + suffix], election_results[3][key], weight)
+        add_values(statistics["conc_average_overall_happiness_" + suffix], election_results[4][key], weight)
+        add_values(statistics["conc_average_overall_happiness_increases_" + suffix], election_results[5][key], weight)
+
+        if election_results[6][key] is not None:
+            add_values(statistics["counter_average_voting_overall_" + suffix], election_results[6][key], weight)
+            add_values(statistics["counter_average_voting_increases_" + suffix], election_results[7][key], weight)
+
+    add_values(statistics["average_tactical_voting_risk_percentage_my_preference"], election_results[1], weight)
+    add_values(statistics["average_tactical_voting_risk_percentage_social_index"], election_results[2], weight)
+
+
+def accumulate_batch_results(totals, batch_results, weights=None):
+    """
+    Adds the results of a batch of basic TVA elections, as returned by simulate_elections, to the partial results of a
+    grid cell. The concurrent voting metrics are not part of a batch, and are observed as 0 like in
+    create_and_run_election
+
+    :param totals: A dictionary of partial results, created by create_totals
+    :param batch_results: A dictionary of (trials) numpy arrays, as returned by simulate_elections
+    :param weights: A list with the number of profiles every election stands for, or None for a single one each
+    :return: void
+    """
+    trials = len(batch_results["risk_H_p"])
+    totals["tests"] += trials
+    statistics = totals["statistics"]
+
+    for key, suffix in HAPPINESS_SUFFIXES.items():
+        add_values(statistics["basic_average_overall_happiness_" + suffix], batch_results["overall_" + key], weights)
+        add_values(statistics["basic_average_happiness_increase_" + suffix], batch_results["increase_" + key], weights)
+        add_values(statistics["conc_average_overall_happiness_" + suffix], np.zeros(trials), weights)
+        add_values(statistics["conc_average_overall_happiness_increases_" + suffix], np.zeros(trials), weights)
+
+    add_values(statistics["average_tactical_voting_risk_percentage_my_preference"], batch_results["risk_H_p"], weights)
+    add_values(statistics["average_tactical_voting_risk_percentage_social_index"], batch_results["risk_H_si"], weights)
+
+
+def merge_totals(totals, partial_totals):
+    """
+    Adds the partial results of a chunk of elections to the partial results of a grid cell
+
+    :param totals: A dictionary of partial results, created by create_totals
+    :param partial_totals: A dictionary of partial results of the same grid cell
+    :return: void
+    """
+    totals["tests"] += partial_totals["tests"]
+    totals["exact"] = partial_totals["exact"]
+
+    for column in partial_totals["statistics"]:
+        merge_statistics(totals["statistics"][column], partial_totals["statistics"][column])
+
+
+def is_precise(totals, precision, confidence=0.95, min_tests=30):
+    """
+    Checks whether the metrics of a grid cell are known precisely enough to stop running elections for it. Metrics
+    that were never observed, such as counter voting in cells where it never happens, do not hold a cell back
+
+    :param totals: A dictionary of partial results, created by create_totals
+    :param precision: A float indicating the largest allowed half-width of the confidence interval of every metric, in
+    percentage points, see PERCENTAGE_SCALES
+    :param confidence: A float indicating the confidence level of the intervals
+    :param min_tests: An integer indicating the number of elections to run before a cell can stop
+    :return: Returns a boolean
+    """
+    if totals["tests"] < min_tests:
+        return False
+
+    return all(get_half_width(statistics, confidence) * PERCENTAGE_SCALES.get(column, 1) <= precision
+               for column, statistics in totals["statistics"].items() if statistics["count"] > 0)
+
+
+def split_trials(tests, chunk_size):
+    """
+    Splits the trials of a grid cell into chunks
+
+    :param tests: An integer indicating the number of trials of the grid cell
+    :param chunk_size: An integer indicating the maximum number of trials per chunk
+    :return: Returns a list of (first trial, number of trials) tuples
+    """
+    return [(first, min(chunk_size, tests - first)) for first in range(0, tests, chunk_size)]
+
+
+def run_sweep(chunk_function, cells, tests, workers=1, chunk_size=10, is_done=None):
+    """
+    Runs every grid cell of a test sweep, split into chunks of trials. With more than one worker, the chunks are spread
+    over a process pool. Every chunk returns its own partial results, which are merged per cell in the parent process
+    in chunk order, so the results do not depend on the order in which the workers finish
+
+    With a stopping rule, the chunks of a cell are run one after the other and the cell stops as soon as the rule holds
+    for the chunks merged so far, so cells that converge quickly use fewer trials. The pool then only runs one chunk
+    per cell at a time, and the decision to stop still only depends on the chunks before it
+
+    :param chunk_function: A function that runs a chunk of trials for a cell, called as
+    chunk_function(*cell, first_trial, n_trials), and returns a dictionary of partial results
+    :param cells: A list of tuples, one per grid cell, with the arguments of the chunk function
+    :param tests: An integer indicating the (maximum) number of trials per grid cell, or a dictionary with the number
+    of trials of every cell
+    :param workers: An integer indicating the number of worker processes
+    :param chunk_size: An integer indicating the maximum number of trials per work unit
+    :param is_done: A function that is called with the partial results of a cell, and returns whether it can stop
+    early, or None to always run all trials
+    :return: Yields (cell, totals) tuples, as soon as all chunks of a cell are done
+    """
+    chunks = {cell: split_trials(tests[cell] if isinstance(tests, dict) else tests, chunk_size) for cell in cells}
+
+    if workers <= 1:
+        for cell in cells:
+            totals = create_totals()
+            for first, n_trials in chunks[cell]:
+                merge_totals(totals, chunk_function(*cell, first, n_trials))
+                if is_done is not None and is_done(totals):
+                    break
+            yield cell, totals
+        return
+
+    # Number of chunks of a cell that may run at the same time, all of them unless the cell can stop early
+    window = {cell: len(chunks[cell]) if is_done is None else 1 for cell in cells}
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+
+        futures = {}
+        totals = {cell: create_totals() for cell in cells}
+        partials = {cell: {} for cell in cells}
+        submitted = {cell: 0 for cell in cells}
+        merged = {cell: 0 for cell in cells}
+
+        def submit(cell):
+            while submitted[cell] < min(merged[cell] + window[cell], len(chunks[cell])):
+                first, n_trials = chunks[cell][submitted[cell]]
+                futures[executor.submit(chunk_function, *cell, first, n_trials)] = (cell, submitted[cell])
+                submitted[cell] += 1
+
+        # Cells without trials have no chunk that could finish them, so they are done right away
+        for cell in cells:
+            if chunks[cell]:
+                submit(cell)
+            else:
+                yield cell, totals.pop(cell)
+
+        while futures:
+            finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+
+            for future in finished:
+                cell, index = futures.pop(future)
+                partials[cell][index] = future.result()
+
+                done = False
+                while merged[cell] in partials[cell]:
+                    merge_totals(totals[cell], partials[cell].pop(merged[cell]))
+                    merged[cell] += 1
+                    done = merged[cell] == len(chunks[cell]) or (is_done is not None and is_done(totals[cell]))
+                    if done:
+                        break
+
+                if done:
+                    partials.pop(cell)
+                    yield cell, totals.pop(cell)
+                else:
+                    submit(cell)
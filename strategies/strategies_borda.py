@@ -1,3 +1,6 @@
+import numpy as np
+
+
 class Strategies_borda:
     """
     Class for a Borda voting strategy
@@ -19,36 +22,60 @@ class Strategies_borda:
         if not valid:
             print("Error: unsupported voting and happiness scheme combination.")
 
-    def check_if_best(self, agent, remainder_votes, pref_pos, winner):
+    def iterate_best_winner(self, prefs, votes, winner):
         """
-        Checks if an agent can change voting strategy to find a better outcome
+        Lazily finds the tactical voting options that make the most preferred candidate win that can be made to win,
+        which gives the best "my preference" happiness. Which candidates can win is decided for all of them at once by
+        get_winnable_candidates, so ballots are only enumerated for the candidate that is chosen
 
-        :param agent: the agent changing their voting strategy
-        :param remainder_votes: tallied votes of all other agents except ours
-        :param pref_pos: position from all tallied votes of highest preferred candidate of agent
-        :return [res_pref, res_si]: list containing the new preference dictionaries for both happiness metrics
+        :param prefs: preference dict of the agent changing their voting strategy
+        :param votes: tallied votes without our agents votes
+        :param winner: the current winner, no candidate below it is considered
+        :return: yields new preferences for tactical voting, one at a time
         """
-
-        new_votes = remainder_votes.copy()
-        prefs = agent.get_preferences()
-        res_si = self.highest_position(next(iter(prefs)), prefs, new_votes, pref_pos)
+        winnable = self.get_winnable_candidates(prefs, votes)
         for x in prefs:
             if x == winner:
-                return [[], res_si]
-            res_pref = self.check_winner_possible(x, prefs, new_votes)
-            if len(res_pref) > 0:
-                return [res_pref, res_si]
-        return [[], []]
+                return
+            if winnable[x]:
+                yield from self.iterate_winner_possible(x, prefs, votes)
+                return
 
-    def check_winner_possible(self, candidate, prefs, votes):
+    def get_winnable_candidates(self, prefs, votes):
         """
-        Checks if an agent can change voting strategy to make a specific candidate win,
-        which is what gives the "my preference" happiness metric its score
+        Checks for every candidate at once whether the agent can make it win, with the greedy test of
+        iterate_winner_possible: the candidate gets the top score, and the other scores are handed out from high to low
+        to the candidates with the most leeway. This works if and only if the candidate with the i-th smallest leeway
+        has a leeway of at least i
+
+        :param prefs: preference dict of the agent changing their voting strategy
+        :param votes: tallied votes without our agents votes
+        :return: dictionary with a boolean per candidate
+        """
+        candidates = list(votes)
+        m = len(prefs)
+        tally = np.array([votes[x] for x in candidates])
+        names = np.array(candidates)
+
+        # leeway[c][x] is the highest score x can get from us while c still wins, the candidate c itself never limits
+        leeway = tally[:, np.newaxis] + (m - 1) - tally[np.newaxis, :] - (names[:, np.newaxis] > names[np.newaxis, :])
+        leeway = leeway.astype(np.float64)
+        np.fill_diagonal(leeway, np.inf)
+
+        sorted_leeway = np.sort(leeway, axis=1)[:, :m - 1]
+        winnable = (sorted_leeway >= np.arange(m - 1)).all(axis=1)
+
+        return dict(zip(candidates, winnable.tolist()))
+
+    def iterate_winner_possible(self, candidate, prefs, votes):
+        """
+        Lazily finds the tactical voting options that make a specific candidate win, which is what gives the "my
+        preference" happiness metric its score
 
         :param candidate: the candidate to get to 1st place
         :param prefs: preference dict of the agent changing their voting strategy
         :param votes: tallied votes without our agents votes
-        :return new_prefs: list of new preferences for tactical voting
+        :return: yields new preferences for tactical voting, one at a time
         """
         up_bound = votes[candidate]+(len(prefs)-1)
         lee = []
@@ -58,13 +85,13 @@ class Strategies_borda:
                 if candidate < x:
                     diff = up_bound - votes[x]
                     if diff < 0:
-                        return []
+                        return
                     lee.append((x, diff))
                 # if our wanted winner loses the tie, x can get up to 1 below the same score
                 else:
                     diff = up_bound - votes[x] - 1
                     if diff < 0:
-                        return []
+                        return
                     lee.append((x, diff))
 
         # sort the list of leeway in descending order
@@ -72,41 +99,36 @@ class Strategies_borda:
 
         # if any leeway is negative, the candidate cannot win
         if sorted_lee[-1][1] < 0:
-            return []
+            return
 
         # check if tactical voting is possible
         i = 0
         for x in range(len(prefs)-2, -1, -1):
             if x > sorted_lee[i][1]:
-                return []
+                return
             i += 1
 
-        # populate tact voting options with recursion
-        database = self.populate_recur([], sorted_lee, len(sorted_lee) - 1, [], True)
-        new_prefs = []
-        for x in database:
+        # enumerate tact voting options one at a time
+        for x in self.iterate_orders(sorted_lee, len(sorted_lee) - 1, True):
             i = len(prefs)-1
-            new_prefs.append({candidate: i})
+            new_prefs = {candidate: i}
             for y in x:
                 i -= 1
-                new_prefs[-1].update({y[0]: i})
+                new_prefs[y[0]] = i
+            yield new_prefs
 
-        return new_prefs
-
-    def highest_position(self, candidate, prefs, votes, pref_pos):
+    def iterate_highest_position(self, candidate, prefs, votes, pref_pos):
         """
-        Finds the highest position the candidate can be made to achieve with tactical voting,
-        which is proportional to the score of the "social index" happiness metric
+        Lazily finds the tactical voting options that get the candidate to the highest position it can be made to
+        achieve, which is proportional to the score of the "social index" happiness metric
 
         :param candidate: the candidate to get to 1st place
         :param prefs: preference dict of the agent changing their voting strategy
         :param votes: tallied votes without our agents votes
         :param pref_pos: position of highest preference in voting
-        :return new_prefs: list of new preferences for tactical voting
+        :return: yields new preferences for tactical voting, one at a time
         """
-        new_prefs = {}
         up_bound = votes[candidate]+(len(prefs)-1)
-        new_prefs[candidate] = len(prefs)-1
         lee = []
         for x in prefs:
             if x != candidate:
@@ -127,51 +149,70 @@ class Strategies_borda:
             if sorted_lee[-1-l][1] >= max_losers:
                 max_losers += 1
         if not (len(sorted_lee) - max_losers) < pref_pos:
-            return []
-        database = self.populate_recur([], sorted_lee, max_losers-1, [], False)
-        new_prefs = []
-        if len(database) == 1 and len(database[0]) == 1:
-            database = [database]
-        for x in database:
+            return
+        for x in self.iterate_orders(sorted_lee, max_losers-1, False):
             i = len(prefs) - 1
-            new_prefs.append({candidate: i})
+            new_prefs = {candidate: i}
             for y in x:
                 i -= 1
-                new_prefs[-1].update({y[0]: i})
-        return new_prefs
+                new_prefs[y[0]] = i
+            yield new_prefs
 
-    def populate_recur(self, current, sorted_leeway, threshold, database, tight):
+    def iterate_orders(self, sorted_leeway, threshold, tight):
         """
-        depth-first tree expansion using recursion for populating the tactical options for both happiness metrics,
-        the expansion will stop if it reaches the limit of tactical options allowed during creation of this object
+        depth-first tree expansion with an explicit stack, which yields the tactical options for both happiness
+        metrics one at a time. A candidate can only be put on a level if its leeway is at least the threshold of
+        the level, which drops by one per level. The options only hold the candidates below the candidate to get to
+        1st place, in order
+
+        Instead of copying the partial option and the remaining candidates for every child, one path and one list of
+        used flags are shared, and a candidate is pushed on the way down and popped on the way back up. The caller
+        decides how many options it takes, so the enumeration stops as soon as the caller does
 
-        :param current: The new preference list to be populated, to be made empty when starting recursion
         :param sorted_leeway: a sorted list of candidate-leeway pairs in decreasing order of leeway
         :param threshold: number of minimum leeway required for expansion
-        :param database: list of preferences collecting all leaf nodes of the recursive process
         :param tight: Boolean of whether or not all items in the sorted list are required to fit under their respective
         threshold, set to true for "my preference" and false for "social index" happiness metrics
-        :return: filled database of new preferences for tactical voting options
+        :return: yields new preference lists of candidate-leeway pairs for tactical voting
         """
-        if len(database) >= self.opt_limit:
-            return database
-        if threshold == -1:
-            database.append(current)
-            # put remainder on the start
-            if not tight and len(sorted_leeway) > 0:
-                for x in sorted_leeway:
-                    database[-1].insert(0, x)
-            return database
-        i = 0
-        while i < len(sorted_leeway):
-            if sorted_leeway[i][1] >= threshold:
-                new_current = current.copy()
-                new_current.append(sorted_leeway[i])
-                new_sorted_leeway = sorted_leeway.copy()
-                new_sorted_leeway.pop(i)
-                database = self.populate_recur(new_current, new_sorted_leeway, threshold - 1, database, tight)
-            elif tight:
-                break
-            i += 1
-        return database
+        used = [False] * len(sorted_leeway)
+        path = []
+        path_indices = []
+
+        # next_index[depth] is the next item of the sorted list to try on that level
+        next_index = [0]
 
+        while next_index:
+            level_threshold = threshold - len(path)
+
+            if level_threshold == -1:
+                if tight:
+                    yield list(path)
+                else:
+                    # put remainder on the start, in reverse order
+                    yield [sorted_leeway[i] for i in range(len(sorted_leeway) - 1, -1, -1) if not used[i]] + path
+                next_index.pop()
+                if path:
+                    path.pop()
+                    used[path_indices.pop()] = False
+                continue
+
+            i = next_index[-1]
+            while i < len(sorted_leeway) and used[i]:
+                i += 1
+
+            # every item was tried on this level, or no other item fits under the threshold
+            if i == len(sorted_leeway) or (tight and sorted_leeway[i][1] < level_threshold):
+                next_index.pop()
+                if path:
+                    path.pop()
+                    used[path_indices.pop()] = False
+                continue
+
+            next_index[-1] = i + 1
+
+            if sorted_leeway[i][1] >= level_threshold:
+                used[i] = True
+                path.append(sorted_leeway[i])
+                path_indices.append(i)
+                next_index.append(0)
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from tva import TVA
+
+
+@pytest.mark.parametrize("voting_scheme", ["Plurality", "AntiPlurality", "VotingForTwo"])
+def test_batch_search_matches_agent_search(voting_scheme):
+    rng = np.random.default_rng(2024)
+
+    for trial in range(120):
+        n_candidates = int(rng.integers(2, 6))
+        n_voters = int(rng.integers(1, 9))
+        candidate_string = "ABCDE"[:n_candidates]
+
+        # Candidate strings that are not in alphabetical order break ties by name, not by index
+        if trial % 3 == 0:
+            candidate_string = "".join(rng.permutation(list(candidate_string)))
+
+        election = TVA(candidate_string, voting_scheme, n_voters, False, rng=rng)
+        election.run()
+
+        batch_scheme = election.scheme()
+        agent_scheme = election.scheme()
+        agent_scheme.get_batch_best_tactical_happinesses = lambda *arguments: None
+
+        batch = batch_scheme.get_best_tactical_happinesses(election)
+        agents = agent_scheme.get_best_tactical_happinesses(election)
+
+        for key in batch:
+            assert np.allclose(batch[key], agents[key], equal_nan=True), \
+                (election.profile.get_preference_strings(), candidate_string, key)
@@ -0,0 +1,48 @@
+from agents.preference_profile import PreferenceProfile
+from simulation.dynamics import run_best_response_dynamics, summarize_dynamics
+from tva import TVA
+
+
+def create_election(preference_strings):
+    """
+    Creates and runs a Plurality election of three agents over A, B, C and D, in which every candidate but D gets one
+    vote, so A wins the tie
+
+    :param preference_strings: A list of strings indicating the preferences of each agent in order
+    :return: Returns a TVA object that was run
+    """
+    election = TVA("ABCD", "Plurality", len(preference_strings), False,
+                   profile=PreferenceProfile.from_strings("ABCD", preference_strings))
+    election.run()
+
+    return election
+
+
+def test_round_robin_converges():
+    # The second agent moves first, and prefers C winning over A, after which the third agent is happy
+    outcome = run_best_response_dynamics(create_election(["ABCD", "BCAD", "CBAD"]), "H_p", "round-robin")
+
+    assert outcome["converged"]
+    assert outcome["cycle_length"] is None
+    assert outcome["moves"] == 1
+    assert outcome["ballots"] == [("A", "B", "C", "D"), ("C", "B", "A", "D"), ("C", "B", "A", "D")]
+    assert outcome["results"] == {"A": 1, "B": 0, "C": 2, "D": 0}
+    assert outcome["winner"] == "C"
+    assert outcome["manipulators"] == 1
+
+
+def test_simultaneous_cycles():
+    # The second and third agent both vote for the other one's candidate at once, and then both switch back
+    outcome = run_best_response_dynamics(create_election(["ABCD", "BCAD", "CBAD"]), "H_p", "simultaneous")
+
+    assert not outcome["converged"]
+    assert outcome["cycle_length"] == 2
+    assert outcome["rounds"] == 2
+    assert outcome["moves"] == 4
+    assert outcome["ballots"] == [("A", "B", "C", "D"), ("B", "C", "A", "D"), ("C", "B", "A", "D")]
+
+    summary = summarize_dynamics([outcome, run_best_response_dynamics(create_election(["ABCD", "BCAD", "CBAD"]))])
+
+    assert summary["convergence_rate"] == 0.5
+    assert summary["cycle_rate"] == 0.5
+    assert summary["average_cycle_length"] == 2
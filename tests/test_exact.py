@@ -0,0 +1,39 @@
+from itertools import combinations_with_replacement, islice, permutations, product
+
+import numpy as np
+import pytest
+
+from agents.preference_profile import PreferenceProfile
+from simulation.exact import count_anonymous_profiles, iterate_multisets
+from simulation.result_store import get_cell_averages
+from simulation.sweep import accumulate_election_results, create_totals, run_sweep
+from tva import create_and_run_election, run_exact_chunk
+
+
+def test_multisets_start_at_any_index():
+    for n_types, size in [(1, 3), (3, 2), (6, 3), (24, 2)]:
+        multisets = list(combinations_with_replacement(range(n_types), size))
+
+        for first in range(len(multisets)):
+            assert list(islice(iterate_multisets(n_types, size, first), 4)) == multisets[first:first + 4]
+
+
+@pytest.mark.parametrize("show_atva_features", [False, True])
+@pytest.mark.parametrize("voting_scheme", ["Borda", "Plurality", "AntiPlurality"])
+def test_exact_averages_match_all_ordered_profiles(voting_scheme, show_atva_features):
+    n_candidates, n_voters = 3, 3
+
+    cell = (n_candidates, n_voters, voting_scheme, show_atva_features)
+    n_profiles = {cell: count_anonymous_profiles(n_candidates, n_voters)}
+    exact = get_cell_averages(dict(run_sweep(run_exact_chunk, [cell], n_profiles, chunk_size=7))[cell])
+
+    totals = create_totals()
+    for ballots in product(permutations(range(n_candidates)), repeat=n_voters):
+        profile = PreferenceProfile("ABC", np.array(ballots))
+        accumulate_election_results(totals, create_and_run_election(n_voters, n_candidates, voting_scheme,
+                                                                    show_atva_features, profile=profile, memo=None))
+    brute_force = get_cell_averages(totals)
+
+    for column in exact:
+        if not column.endswith("_ci"):
+            assert exact[column] == pytest.approx(brute_force[column], nan_ok=True), column
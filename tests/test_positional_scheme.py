@@ -0,0 +1,51 @@
+from itertools import permutations
+
+import numpy as np
+import pytest
+
+from agents.preference_profile import PreferenceProfile
+from tva import TVA
+
+
+def get_brute_force_happinesses(scheme, agent, remainder):
+    """
+    Computes the best happiness an agent can reach by trying every possible ballot
+
+    :param scheme: A voting scheme object
+    :param agent: An agent object
+    :param remainder: A dictionary with the tallied votes of all other agents
+    :return: Returns a dictionary with the best happiness per type of happiness
+    """
+    best = {"H_p": -1, "H_si": -1}
+
+    for ballot in permutations(agent.ballot):
+        happiness = agent.get_happiness(scheme.tally_preference_list(remainder, list(ballot)))
+        for key in best:
+            best[key] = max(best[key], happiness[key])
+
+    return best
+
+
+@pytest.mark.parametrize("voting_scheme", ["Dowdall", "ThreeApproval", "TruncatedBorda"])
+def test_tactical_options_match_brute_force(voting_scheme):
+    rng = np.random.default_rng(2024)
+
+    for _ in range(150):
+        n_candidates = int(rng.integers(3, 6))
+        n_voters = int(rng.integers(2, 6))
+        candidate_string = "ABCDE"[:n_candidates]
+
+        profile = PreferenceProfile(candidate_string, rng.permuted(np.tile(np.arange(n_candidates), (n_voters, 1)),
+                                                                   axis=1))
+        election = TVA(candidate_string, voting_scheme, n_voters, False, profile=profile)
+        election.run()
+        scheme = election.scheme()
+
+        for agent in election.get_agents():
+            original = agent.get_happiness(election.results)
+            best = get_brute_force_happinesses(scheme, agent, scheme.get_remainder(agent, election))
+            tactical_set = scheme.tactical_options(agent, election)
+
+            for key in best:
+                found = max((option[3][key] for option in tactical_set[key].values()), default=original[key])
+                assert found == best[key], (profile.get_preference_strings(), agent.name, key)
@@ -0,0 +1,25 @@
+import numpy as np
+
+from agents.agent import Agent
+from strategies.strategies_borda import Strategies_borda
+from voting.voting_schemes import Borda
+
+
+def test_winnable_candidates_match_candidate_search():
+    rng = np.random.default_rng(2024)
+    strategies = Strategies_borda("Borda", 20)
+
+    for _ in range(2000):
+        n_candidates = int(rng.integers(3, 8))
+        candidate_string = "ABCDEFG"[:n_candidates]
+
+        agent = Agent("Agent", "".join(rng.permutation(list(candidate_string))), Borda)
+
+        votes = {candidate: int(rng.integers(0, 3 * n_candidates)) * rng.choice([1, 0.5]).item()
+                 for candidate in candidate_string}
+
+        winnable = strategies.get_winnable_candidates(agent.preferences, votes)
+
+        for candidate in candidate_string:
+            can_win = next(strategies.iterate_winner_possible(candidate, agent.preferences, votes), None) is not None
+            assert winnable[candidate] == can_win, (agent.ballot, votes, candidate)
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from simulation.result_store import METRIC_COLUMNS
+from simulation.streaming_stats import add_values
+from simulation.sweep import create_totals, is_precise, run_sweep
+
+
+def test_risks_gate_stopping_in_percentage_points():
+    rng = np.random.default_rng(2024)
+    totals = create_totals()
+    totals["tests"] = 100
+
+    # Only the risk varies, by a few percentage points between elections
+    for column in METRIC_COLUMNS:
+        if column == "average_tactical_voting_risk_percentage_my_preference":
+            add_values(totals["statistics"][column], rng.uniform(0, 0.1, 100))
+        else:
+            add_values(totals["statistics"][column], np.full(100, 50.0))
+
+    assert not is_precise(totals, precision=0.1)
+    assert is_precise(totals, precision=5)
+
+
+def run_empty_chunk(n_candidates, n_voters, first_trial, n_trials):
+    """
+    Runs a chunk of trials that each add nothing but their count to the partial results
+
+    :param n_candidates: An integer indicating the number of candidates
+    :param n_voters: An integer indicating the number of voters
+    :param first_trial: An integer indicating the index of the first trial of the chunk
+    :param n_trials: An integer indicating the number of trials in the chunk
+    :return: Returns a dictionary of partial results of the chunk
+    """
+    totals = create_totals()
+    totals["tests"] = n_trials
+
+    return totals
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_cells_without_trials_are_yielded(workers):
+    cells = [(3, 2), (3, 3), (4, 2)]
+    tests = {(3, 2): 5, (3, 3): 0, (4, 2): 12}
+
+    results = dict(run_sweep(run_empty_chunk, cells, tests, workers, chunk_size=4))
+
+    assert {cell: totals["tests"] for cell, totals in results.items()} == tests
@@ -0,0 +1,33 @@
+import pytest
+
+from agents.preference_profile import PreferenceProfile
+from simulation.random_streams import get_trial_generator
+from tva import TVA, create_and_run_election, simulate_elections
+
+
+def test_profile_of_other_size_is_rejected():
+    profile = PreferenceProfile.from_strings("ABC", ["ABC", "CBA", "BAC"])
+
+    assert TVA("ABC", "Plurality", 3, False, profile=profile).get_profile() is profile
+
+    with pytest.raises(ValueError):
+        TVA("ABC", "Plurality", 4, False, profile=profile)
+
+
+@pytest.mark.parametrize("voting_scheme", ["Borda", "Plurality", "AntiPlurality", "VotingForTwo", "Dowdall"])
+def test_batch_matches_elections_run_one_by_one(voting_scheme):
+    seed, n_candidates, n_voters = 2024, 4, 7
+    rngs = [get_trial_generator(seed, n_candidates, n_voters, trial) for trial in range(20)]
+
+    batch_results = simulate_elections(n_voters, n_candidates, voting_scheme, rngs)
+
+    for trial in range(20):
+        election_results = create_and_run_election(n_voters, n_candidates, voting_scheme, False,
+                                                   get_trial_generator(seed, n_candidates, n_voters, trial), memo=None)
+
+        assert batch_results["risk_H_p"][trial] == pytest.approx(election_results[1])
+        assert batch_results["risk_H_si"][trial] == pytest.approx(election_results[2])
+
+        for key in ("H_p", "H_si"):
+            assert batch_results["overall_" + key][trial] == pytest.approx(election_results[0][key])
+            assert batch_results["increase_" + key][trial] == pytest.approx(election_results[3][key])
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from agents.preference_profile import PreferenceProfile
+from tva import TVA
+
+
+@pytest.mark.parametrize("voting_scheme", ["Borda", "Plurality", "AntiPlurality", "VotingForTwo", "Dowdall"])
+def test_remainder_is_the_tally_of_all_other_agents(voting_scheme):
+    rng = np.random.default_rng(2024)
+
+    for _ in range(50):
+        n_candidates = int(rng.integers(2, 6))
+        n_voters = int(rng.integers(1, 7))
+
+        election = TVA("ABCDE"[:n_candidates], voting_scheme, n_voters, False, rng=rng)
+        election.run()
+        scheme = election.scheme()
+        agents = election.get_agents()
+
+        for i, agent in enumerate(agents):
+            others = dict(election.candidates)
+            for other_agent in agents[:i] + agents[i + 1:]:
+                others = scheme.tally_preference_list(others, list(other_agent.ballot))
+
+            remainder = scheme.get_remainder(agent, election)
+            assert remainder == pytest.approx(others)
+
+            # A tactical ballot is tallied by adding it to the remainder, instead of tallying all agents again
+            ballot = "".join(rng.permutation(list(agent.ballot)))
+            preference_strings = election.get_profile().get_preference_strings()
+            preference_strings[i] = ballot
+
+            tactical_election = TVA(election.candidate_string, voting_scheme, n_voters, False,
+                                    profile=PreferenceProfile.from_strings(election.candidate_string,
+                                                                           preference_strings))
+            tactical_election.run()
+
+            assert scheme.tally_preference_list(remainder, list(ballot)) == pytest.approx(tactical_election.results)
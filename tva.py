@@ -5,13 +5,31 @@ The Tactical Voter Analyst (TVA) for the course: Multi-Agent Systems
 
 """
 
-import importlib
 import os.path
-import random
 import numpy as np
-from copy import copy
+from copy import deepcopy
+from functools import partial
 
 from agents.agent import Agent, get_winner
+from agents.preference_profile import PreferenceProfile, get_happiness_arrays
+from voting.election_snapshot import ElectionSnapshot
+from voting.tactical_cache import TacticalCache
+from voting.voting_schemes import get_best_option, get_voting_scheme
+from simulation.checkpoint import CellCheckpoint, get_cell_key
+from simulation.election_memo import ElectionMemo
+from simulation.exact import count_anonymous_profiles, get_anonymous_profiles
+from simulation.result_store import get_cell_averages, save_results
+from simulation.random_streams import get_trial_generator
+from simulation.batch import stack_ballots, get_rank_tensor, tally_ballots, summarize_tactical_happinesses
+from simulation.sweep import create_totals, accumulate_election_results, accumulate_batch_results, is_precise, \
+    run_sweep
+
+# Results of create_and_run_election by anonymous profile, kept across the elections and grid cells of a process
+election_memo = ElectionMemo()
+
+# Random elections of a grid cell are only memoized when the cell has at most this many anonymous profiles per trial,
+# since profiles rarely repeat when there are many more of them than trials
+MEMO_PROFILES_PER_TRIAL = 100
 
 
 class TVA:
@@ -19,17 +37,23 @@ class TVA:
     Tactical Voting Analyst class
     """
 
-    def __init__(self, candidate_string, voting_scheme, num_agents, advanced_tva):
+    def __init__(self, candidate_string, voting_scheme, num_agents, advanced_tva, cache_size=4096, rng=None,
+                 profile=None):
         """
         The constructor for the TVA
 
         When initialised, this constructor creates a dictionary of the candidates from the candidate string.
-        The class then imports the respective voting scheme - raises an exception if not found in voting_schemes.py
+        The class then gets the respective voting scheme - raises an exception if not found in voting_schemes.py
         It also creates the specified number of agents
 
         :param candidate_string: A string of candidates, for example: "ABCDEFG"
         :param voting_scheme: A string indicating the type of voting
         :param num_agents: An integer for the number of agents in the election
+        :param advanced_tva: A boolean indicating whether the advanced TVA should be run
+        :param cache_size: An integer for the maximum number of tactical searches kept in the tactical cache
+        :param rng: A numpy random Generator used to generate the preferences, a fresh one is created if None
+        :param profile: A preference profile object with the preferences of num_agents agents, generated randomly if
+        None
         """
 
         self.candidate_string = candidate_string
@@ -37,15 +61,12 @@ class TVA:
         self.num_agents = num_agents
         self.voting_scheme = voting_scheme
         self.is_atva = advanced_tva
+        self.rng = rng if rng is not None else np.random.default_rng()
 
-        module = importlib.import_module("voting.voting_schemes")
-
-        # Check if module has the voting scheme
-        if not hasattr(module, voting_scheme):
-            raise Exception(f"{voting_scheme} has not been implemented")
-
-        self.scheme = getattr(module, voting_scheme)
+        self.scheme = get_voting_scheme(voting_scheme)
 
+        self.profile = profile
+        self.tactical_cache = TacticalCache(cache_size)
         self.agents = self.create_agents(num_agents)
 
         self.results = {}
@@ -58,7 +79,7 @@ class TVA:
 
         :return: void
         """
-        self.results = self.scheme().run_scheme(self.candidates, self.agents)
+        self.results = self.scheme().run_profile(self.candidates, self.profile)
 
     def get_agents(self):
         """
@@ -66,17 +87,72 @@ class TVA:
         """
         return self.agents
 
+    def get_profile(self):
+        """
+        :return: Returns the preference profile of the agents in the election
+        """
+        return self.profile
+
+    def get_snapshot(self):
+        """
+        Takes an immutable snapshot of the election, which shares the agents, the profile and the tactical cache of
+        the election. The advanced TVA runs on snapshots, so it never modifies the election, see ElectionSnapshot
+
+        :return: Returns an election snapshot object
+        """
+        return ElectionSnapshot(self.candidates, self.voting_scheme, self.profile, dict(self.results),
+                                list(self.agents), self.tactical_cache)
+
+    def with_ballot(self, index, preference_list, results=None):
+        """
+        Derives a snapshot of the election in which one agent casts another ballot, see ElectionSnapshot.with_ballot
+
+        :param index: An integer indicating the index of the agent in the election
+        :param preference_list: A list of candidates in the order of the new ballot
+        :param results: A dictionary of results of the election with the new ballot, if they are already known
+        :return: Returns an election snapshot object
+        """
+        return self.get_snapshot().with_ballot(index, preference_list, results)
+
+    def get_agent_groups(self):
+        """
+        Groups the agents of the election by ballot type, see PreferenceProfile.get_ballot_types
+
+        :return: Returns a list with a list of agents per ballot type, in order of the first agent of every type
+        """
+        _, first_indices, inverse, _ = self.profile.get_ballot_types()
+
+        groups = [[] for _ in first_indices]
+        for agent, ballot_type in zip(self.agents, inverse.ravel().tolist()):
+            groups[ballot_type].append(agent)
+
+        return [groups[ballot_type] for ballot_type in np.argsort(first_indices).tolist()]
+
+    def get_cache_statistics(self):
+        """
+        :return: Returns a dictionary with the hits, misses and size of the tactical cache
+        """
+        return self.tactical_cache.get_statistics()
+
     def create_agents(self, num_agents):
         """
-        Creates a specified number of agents
+        Creates a specified number of agents. The preferences of all agents are stored in the preference profile of
+        the election, and every agent is created from its row in the profile. If the TVA was not given a profile, it
+        is generated randomly
 
         :param num_agents: An integer indicating the number of agents to create
         :return: Returns a list of agent objects
         """
+        if self.profile is None:
+            self.profile = self.generate_profile(num_agents)
+        elif len(self.profile) != num_agents:
+            raise ValueError(f"The profile holds the preferences of {len(self.profile)} agents instead of {num_agents}")
+        self.tactical_cache.invalidate()
+
         agents = []
 
         for i in range(num_agents):
-            agents.append(Agent(f"Agent{i + 1}", self.generate_preferences(), self.scheme))
+            agents.append(Agent.from_profile(f"Agent{i + 1}", self.profile, i, self.scheme))
 
         return agents
 
@@ -87,7 +163,20 @@ class TVA:
 
         :return: Returns a randomly shuffled string
         """
-        return "".join(random.sample(self.candidate_string, len(self.candidate_string)))
+        return "".join(self.rng.permutation(list(self.candidate_string)))
+
+    def generate_profile(self, num_agents):
+        """
+        Generates random preferences for a specified number of agents at once, by shuffling every row of a
+        (agents x candidates) matrix with the random generator of the TVA
+
+        :param num_agents: An integer indicating the number of agents
+        :return: Returns a preference profile object
+        """
+        m = len(self.candidate_string)
+        ballots = self.rng.permuted(np.tile(np.arange(m), (num_agents, 1)), axis=1)
+
+        return PreferenceProfile(self.candidate_string, ballots)
 
     def create_candidates(self):
         """
@@ -113,40 +202,31 @@ class TVA:
 
         matrix = []
 
-        for agent in self.agents:
-
-            row = [agent.name]
-
-            for candidate in agent.get_preferences():
-                row.append(f"{candidate}")
-
-            matrix.append(row)
+        for i, agent in enumerate(self.agents):
+            matrix.append([agent.name] + self.profile.get_preference_list(i))
 
         np_matrix = np.array(matrix)
 
         return np_matrix.transpose()
 
     def get_overall_happiness(self):
+        """
+        Computes the overall happiness of the election, which is the average happiness of all agents
 
-        for a in self.agents:
-            happiness = a.get_happiness(self.results)
-
-            for happiness_computation in happiness:
-                if happiness_computation not in self.happinesses:
-                    self.happinesses[happiness_computation] = []
-                self.happinesses[happiness_computation].append(happiness[happiness_computation])
-
-        overall_happiness = {}
+        :return: Returns a dictionary with the average of each type of happiness
+        """
+        happinesses = self.profile.get_happinesses(self.profile.to_vector(self.results))
 
-        for happiness_computation in self.happinesses:
-            overall_happiness[happiness_computation] = sum(self.happinesses[happiness_computation]) / len(
-                self.happinesses[happiness_computation])
+        self.happinesses = {key: happinesses[key].tolist() for key in happinesses}
 
-        return overall_happiness
+        return {key: happinesses[key].mean().item() for key in happinesses}
 
-    def get_report(self):
+    def get_report(self, executor=None):
         """
         Creates a report of the entire election, and highlights the most important information
+
+        :param executor: An executor of the concurrent.futures module that computes the counter votes of the agents,
+        or None to compute them one after the other
         :return: Returns a string reporting the important info of the election
         """
 
@@ -185,6 +265,8 @@ class TVA:
 
         happiness_threshold = 99
 
+        snapshot = self.get_snapshot()
+
         # Check how agents would change their votes depending on happiness
         for a in self.agents:
 
@@ -197,7 +279,7 @@ class TVA:
                 string += f"{str(a)} was happy and didn't change their preferences\n\n"
 
             else:
-                tact_dictionary = self.scheme().tactical_options(a, copy(self))
+                tact_dictionary = self.scheme().get_tactical_options(a, snapshot)
 
                 string += f"For {str(a)}, the tactical options are:\n"
 
@@ -230,9 +312,9 @@ class TVA:
 
             string += f"##### ADVANCED TVA: Counter voting strategies #####\n\n"
 
-            for a in self.agents:
+            counter_votes = get_counter_votes(snapshot, range(len(self.agents)), executor)
 
-                counter_voting_set = self.scheme().counter_vote(a, copy(self))
+            for a, counter_voting_set in zip(self.agents, counter_votes):
 
                 string += f"For {str(a)} \n"
 
@@ -274,7 +356,7 @@ class TVA:
 
             string += f"##### ADVANCED TVA: Concurrent voting strategies #####\n\n"
 
-            new_social_outcomes = self.scheme().concurrent_vote(copy(self))
+            new_social_outcomes = self.scheme().concurrent_vote(snapshot)
 
             for happiness_type in new_social_outcomes:
 
@@ -291,60 +373,58 @@ class TVA:
         return string
 
 
-def create_and_run_election(n_voters, n_candidates, voting_scheme, is_advanced):
+def create_and_run_election(n_voters, n_candidates, voting_scheme, is_advanced, rng=None, profile=None,
+                            memo=election_memo, executor=None):
 
     candidates = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
     candidates = candidates[:n_candidates]
 
-    election = TVA(candidates, voting_scheme, n_voters, is_advanced)
+    election = TVA(candidates, voting_scheme, n_voters, is_advanced, rng=rng, profile=profile)
+
+    # Elections with the same ballots in another order were already run if their anonymous profile is in the memo
+    if memo is not None:
+        memo_key = memo.get_key(voting_scheme, is_advanced, election.get_profile())
+        election_results = memo.get(memo_key)
+
+        if election_results is not None:
+            return deepcopy(election_results)
+
+        election_results = run_election(election, executor)
+        memo.put(memo_key, deepcopy(election_results))
+
+        return election_results
+
+    return run_election(election, executor)
+
+
+def run_election(election, executor=None):
+    """
+    Runs an election with the basic TVA, and the advanced TVA if the election is advanced, and summarises it
+
+    :param election: A TVA object
+    :param executor: An executor of the concurrent.futures module that computes the counter votes of the agents, or
+    None to compute them one after the other
+    :return: Returns the tuple of election results of create_and_run_election
+    """
+    is_advanced = election.is_atva
+
     election.run()
 
-    risk_preference_happiness_count = 0
-    risk_social_index_count = 0
-
-    basic_tva_happiness_increases = {"H_p": 0, "H_si": 0}
-
-    for agent in election.get_agents():
-
-        old_happiness = agent.get_happiness(election.results)
-
-        tactical_dictionary = election.scheme().tactical_options(agent, election)
-
-        for key in tactical_dictionary:
-            prev_happiness = old_happiness[key]
-            if key == "H_p" and len(tactical_dictionary[key]) > 0:
-                risk_preference_happiness_count += 1
-                maximum_tactical_happiness = 0
-                for index in tactical_dictionary[key]:
-                    tactical_option = tactical_dictionary[key][index]
-                    new_happiness = tactical_option[3][key]
-                    if new_happiness > maximum_tactical_happiness:
-                        maximum_tactical_happiness = new_happiness
-                basic_tva_happiness_increases[key] += maximum_tactical_happiness - prev_happiness
-            elif key == "H_si" and len(tactical_dictionary[key]) > 0:
-                risk_social_index_count += 1
-                maximum_tactical_happiness = 0
-                for index in tactical_dictionary[key]:
-                    tactical_option = tactical_dictionary[key][index]
-                    new_happiness = tactical_option[3][key]
-                    if new_happiness > maximum_tactical_happiness:
-                        maximum_tactical_happiness = new_happiness
-                basic_tva_happiness_increases[key] += maximum_tactical_happiness - prev_happiness
-
-    if basic_tva_happiness_increases["H_p"] != 0:
-        total_increase = basic_tva_happiness_increases["H_p"]
-        basic_tva_happiness_increases["H_p"] = total_increase/risk_preference_happiness_count
-    else:
-        basic_tva_happiness_increases["H_p"] = 0
-
-    if basic_tva_happiness_increases["H_si"] != 0:
-        total_increase = basic_tva_happiness_increases["H_si"]
-        basic_tva_happiness_increases["H_si"] = total_increase/risk_social_index_count
-    else:
-        basic_tva_happiness_increases["H_si"] = 0
-
-    risk_preference_happiness_count = risk_preference_happiness_count / n_voters
-    risk_social_index_count = risk_social_index_count / n_voters
+    # Agents with the same ballot type share their tactical search, see VotingScheme.get_best_tactical_happinesses
+    happinesses = election.profile.get_happinesses(election.profile.to_vector(election.results))
+    best_happinesses = election.scheme().get_best_tactical_happinesses(election)
+
+    summary = summarize_tactical_happinesses(happinesses, best_happinesses)
+
+    risk_preference_happiness_count = summary["H_p"][0].item()
+    risk_social_index_count = summary["H_si"][0].item()
+    basic_tva_happiness_increases = {key: summary[key][1].item() for key in summary}
+
+    # The advanced TVA metrics stay 0 (or None for counter voting) when only the basic TVA is run
+    conc_overall_happiness = {"H_p": 0, "H_si": 0}
+    conc_voting_happiness_increases = {"H_p": 0, "H_si": 0}
+    counter_voting_dict_overall = {"H_p": None, "H_si": None}
+    counter_voting_dict_increases = {"H_p": None, "H_si": None}
 
     if is_advanced:
 
@@ -352,21 +432,21 @@ def create_and_run_election(n_voters, n_candidates, voting_scheme, is_advanced):
         for Concurrent Voting
         '''
 
-        election_copy = copy(election)
-        concurrent_voting_outcome = election_copy.scheme().concurrent_vote(election_copy)
+        snapshot = election.get_snapshot()
+        concurrent_voting_outcome = election.scheme().concurrent_vote(snapshot)
         conc_voting_happiness_increases = {"H_p": [0, 0], "H_si": [0, 0]}
         conc_overall_happiness = {"H_p": 0, "H_si": 0}
 
+        old_happinesses = election.profile.get_happinesses(election.profile.to_vector(election.results))
+
         for key in concurrent_voting_outcome:
 
-            election_copy.results = concurrent_voting_outcome[key][1]
-            conc_overall_happiness[key] = election_copy.get_overall_happiness()[key]
+            new_results = concurrent_voting_outcome[key][1]
+            conc_overall_happiness[key] = snapshot.with_results(new_results).get_overall_happiness()[key]
 
-            for agent in [tactical_agent for tactical_agent in concurrent_voting_outcome[key][2:]]:
-                old_happiness = agent[0].get_happiness(election.results)[key]
-                new_happiness = agent[0].get_happiness(election_copy.results)[key]
-                conc_voting_happiness_increases[key][0] += new_happiness - old_happiness
-                conc_voting_happiness_increases[key][1] += 1
+            new_happinesses = election.profile.get_happinesses(election.profile.to_vector(new_results))
+            conc_voting_happiness_increases[key][0] += (new_happinesses[key] - old_happinesses[key]).sum().item()
+            conc_voting_happiness_increases[key][1] += len(concurrent_voting_outcome[key]) - 2
 
         for key in conc_voting_happiness_increases:
             conc_voting_happiness_increases[key] = conc_voting_happiness_increases[key][0]/conc_voting_happiness_increases[key][1]
@@ -377,40 +457,39 @@ def create_and_run_election(n_voters, n_candidates, voting_scheme, is_advanced):
 
         counter_voting_dict_overall = {"H_p": [0, 0], "H_si": [0, 0]}
         counter_voting_dict_increases = {"H_p": [0, 0], "H_si": [0, 0]}
-        agents_copy = [copy(agent) for agent in election.get_agents()]
 
-        for agent in agents_copy:
+        # Agents with the same ballot type have the same counter votes, which are computed once and counted for
+        # every agent of the type
+        groups = election.get_agent_groups()
+        agent_indices = {agent: index for index, agent in enumerate(election.get_agents())}
+        counter_votes = get_counter_votes(snapshot, [agent_indices[group[0]] for group in groups], executor)
 
-            election_copy = copy(election)
-            old_happiness = agent.get_happiness(election.results)
+        for group, counter_voting_options in zip(groups, counter_votes):
 
-            counter_voting_options = election_copy.scheme().counter_vote(agent, election_copy)
+            agent = group[0]
+            count = len(group)
+
+            old_happiness = agent.get_happiness(election.results)
 
             for key in counter_voting_options:
                 for counter_set in counter_voting_options[key]:
                     if counter_set[3] is not None:
                         if len(counter_set[3]) > 0:
-                            maximum_tactical_happiness = 0
-                            best_tactical_option = None
-                            for index in counter_set[3]:
-                                tactical_option = counter_set[3][index]
-                                if tactical_option[3][key] > maximum_tactical_happiness:
-                                    maximum_tactical_happiness = tactical_option[3][key]
-                                    best_tactical_option = tactical_option
+                            best_tactical_option = get_best_option(counter_set[3].values(), key)
 
-                            counter_voting_dict_overall[key][0] += best_tactical_option[4][key]
-                            counter_voting_dict_increases[key][0] += best_tactical_option[3][key] - old_happiness[key]
+                            counter_voting_dict_overall[key][0] += count * best_tactical_option[4][key]
+                            counter_voting_dict_increases[key][0] += \
+                                count * (best_tactical_option[3][key] - old_happiness[key])
 
                         else:
 
-                            election_copy.results = counter_set[4]
-                            new_overall_happiness = election_copy.get_overall_happiness()[key]
-                            counter_voting_dict_overall[key][0] += new_overall_happiness
+                            new_overall_happiness = snapshot.with_results(counter_set[4]).get_overall_happiness()[key]
+                            counter_voting_dict_overall[key][0] += count * new_overall_happiness
                             new_happiness = agent.get_happiness(counter_set[4])[key]
-                            counter_voting_dict_increases[key][0] += new_happiness - old_happiness[key]
+                            counter_voting_dict_increases[key][0] += count * (new_happiness - old_happiness[key])
 
-                        counter_voting_dict_overall[key][1] += 1
-                        counter_voting_dict_increases[key][1] += 1
+                        counter_voting_dict_overall[key][1] += count
+                        counter_voting_dict_increases[key][1] += count
 
         for key in counter_voting_dict_overall:
             if counter_voting_dict_overall[key][1] != 0:
@@ -429,149 +508,294 @@ def create_and_run_election(n_voters, n_candidates, voting_scheme, is_advanced):
            counter_voting_dict_overall, counter_voting_dict_increases
 
 
-def run_tests(data_folder, tests, voting_scheme, show_atva_features):
+def get_counter_votes(snapshot, agent_indices, executor=None):
+    """
+    Computes the counter votes of several agents of an election, see VotingScheme.counter_vote. The election snapshot
+    is never modified, so the agents can be spread over the threads or processes of an executor. Threads share one
+    memo of counters by ballot types, while every process task starts with its own
+
+    :param snapshot: An election snapshot, see TVA.get_snapshot
+    :param agent_indices: A list of integers indicating the index of every agent in the election
+    :param executor: An executor of the concurrent.futures module, or None to compute the counter votes one after the
+    other
+    :return: Returns a list with the dictionary of counter votes of every agent, in the order of the indices
+    """
+    counter_function = partial(run_counter_vote, snapshot, {})
+
+    if executor is None:
+        return list(map(counter_function, agent_indices))
+
+    return list(executor.map(counter_function, agent_indices))
+
+
+def run_counter_vote(snapshot, counter_memo, agent_index):
+    """
+    Computes the counter votes of one agent of an election, as a task of get_counter_votes. The agent is given by
+    index, so that it is the same object as in the snapshot after both were sent to another process
+
+    :param snapshot: An election snapshot, see TVA.get_snapshot
+    :param counter_memo: A dictionary of counters by ballot types, shared by all tasks that run in the same process
+    :param agent_index: An integer indicating the index of the agent in the election
+    :return: Returns the dictionary of counter votes of the agent
+    """
+    return snapshot.scheme().counter_vote(snapshot.get_agents()[agent_index], snapshot, counter_memo)
+
+
+def simulate_elections(n_voters, n_candidates, voting_scheme, rngs):
+    """
+    Runs many basic TVA elections at once. The preferences of all elections are generated as one
+    (trials x voters x candidates) tensor, see simulate_profiles
+
+    :param n_voters: An integer indicating the number of voters
+    :param n_candidates: An integer indicating the number of candidates
+    :param voting_scheme: A string indicating the type of voting
+    :param rngs: A list of numpy random Generators, one per election
+    :return: Returns a dictionary of (trials) numpy arrays, see simulate_profiles
+    """
+    return simulate_profiles(n_candidates, voting_scheme, stack_ballots(rngs, n_voters, n_candidates))
+
+
+def simulate_profiles(n_candidates, voting_scheme, ballots):
+    """
+    Runs the basic TVA for many elections at once. The preferences of all elections are tallied and turned into
+    happiness values in one vectorized pass. Tactical voting risks are computed for all elections together when the
+    voting scheme supports it, and election by election otherwise
+
+    :param n_candidates: An integer indicating the number of candidates
+    :param voting_scheme: A string indicating the type of voting
+    :param ballots: A (trials x voters x candidates) numpy array with the candidate indices in preference order
+    :return: Returns a dictionary of (trials) numpy arrays with the overall happiness, risk and average happiness
+    increase of every election per type of happiness. Averages over the trials are their mean(axis=0)
+    """
+    candidates = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"[:n_candidates]
+    scheme = get_voting_scheme(voting_scheme)()
+    n_voters = ballots.shape[1]
+
+    ranks = get_rank_tensor(ballots)
+    tallies = tally_ballots(scheme.get_scores(n_candidates), ballots)
+
+    tie_order = PreferenceProfile(candidates, ballots[0]).tie_order
+    happinesses = get_happiness_arrays(ballots, ranks, tallies, tie_order)
+
+    best_happinesses = scheme.get_batch_best_tactical_happinesses(candidates, ballots, ranks, tallies)
+
+    if best_happinesses is None:
+        best_happinesses = {key: np.empty(happinesses[key].shape) for key in happinesses}
+
+        for trial in range(len(ballots)):
+            election = TVA(candidates, voting_scheme, n_voters, False,
+                           profile=PreferenceProfile(candidates, ballots[trial]))
+            election.run()
+
+            trial_happinesses = scheme.get_best_tactical_happinesses(election)
+            for key in best_happinesses:
+                best_happinesses[key][trial] = trial_happinesses[key]
+
+    summary = summarize_tactical_happinesses(happinesses, best_happinesses)
+
+    batch_results = {}
+    for key in happinesses:
+        batch_results["overall_" + key] = happinesses[key].mean(axis=-1)
+        batch_results["risk_" + key], batch_results["increase_" + key] = summary[key]
+
+    return batch_results
+
+
+def run_test_chunk(n_candidates, n_voters, voting_scheme, show_atva_features, seed, first_trial, n_trials):
+    """
+    Runs a chunk of the trials of one grid cell of the test sweep. This is the work unit of a (parallel) sweep. Every
+    trial uses its own random stream, so a trial can be re-run in isolation with
+    create_and_run_election(n_voters, n_candidates, voting_scheme, show_atva_features,
+    get_trial_generator(seed, n_candidates, n_voters, trial))
+
+    :param n_candidates: An integer indicating the number of candidates
+    :param n_voters: An integer indicating the number of voters
+    :param voting_scheme: A string indicating the type of voting
+    :param show_atva_features: A boolean indicating whether the advanced TVA should be run
+    :param seed: An integer indicating the root seed of the sweep
+    :param first_trial: An integer indicating the index of the first trial of the chunk
+    :param n_trials: An integer indicating the number of trials in the chunk
+    :return: Returns a dictionary of partial results of the chunk
+    """
+    totals = create_totals()
+
+    # The basic TVA runs all trials of the chunk as one batch
+    if not show_atva_features:
+        rngs = [get_trial_generator(seed, n_candidates, n_voters, trial)
+                for trial in range(first_trial, first_trial + n_trials)]
+        accumulate_batch_results(totals, simulate_elections(n_voters, n_candidates, voting_scheme, rngs))
+        return totals
+
+    # The trials of the cell up to this chunk are the elections the memo can have seen
+    use_memo = count_anonymous_profiles(n_candidates, n_voters) <= MEMO_PROFILES_PER_TRIAL * (first_trial + n_trials)
+    memo = election_memo if use_memo else None
+
+    for trial in range(first_trial, first_trial + n_trials):
+        rng = get_trial_generator(seed, n_candidates, n_voters, trial)
+        election_results = create_and_run_election(n_voters, n_candidates, voting_scheme, show_atva_features, rng,
+                                                   memo=memo)
+        accumulate_election_results(totals, election_results)
+
+    return totals
+
+
+def run_exact_chunk(n_candidates, n_voters, voting_scheme, show_atva_features, first_profile, n_profiles):
+    """
+    Runs a chunk of the anonymous profiles of one grid cell of the test sweep. Every profile is run once, and weighted
+    by the number of random profiles with the same ballots, so the averages over all chunks of the cell are the exact
+    expectations of the metrics under impartial culture. The order of the agents is not part of an anonymous profile,
+    so the agents of every profile are ordered by ballot. Every profile is distinct, so the election memo is not used
+
+    :param n_candidates: An integer indicating the number of candidates
+    :param n_voters: An integer indicating the number of voters
+    :param voting_scheme: A string indicating the type of voting
+    :param show_atva_features: A boolean indicating whether the advanced TVA should be run
+    :param first_profile: An integer indicating the index of the first anonymous profile of the chunk
+    :param n_profiles: An integer indicating the number of anonymous profiles in the chunk
+    :return: Returns a dictionary of partial results of the chunk
+    """
+    totals = create_totals()
+    totals["exact"] = True
+
+    ballots, weights = get_anonymous_profiles(n_candidates, n_voters, first_profile, n_profiles)
+
+    if not show_atva_features:
+        accumulate_batch_results(totals, simulate_profiles(n_candidates, voting_scheme, ballots), weights)
+        return totals
+
+    candidates = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"[:n_candidates]
+
+    for profile_ballots, weight in zip(ballots, weights):
+        election_results = create_and_run_election(n_voters, n_candidates, voting_scheme, show_atva_features,
+                                                   profile=PreferenceProfile(candidates, profile_ballots), memo=None)
+        accumulate_election_results(totals, election_results, weight)
+
+    return totals
+
+
+def run_tests(data_folder, tests, voting_scheme, show_atva_features, workers=1, chunk_size=10, seed=None,
+              precision=None, confidence=0.95, min_tests=30, exact_threshold=None):
+    """
+    Runs a sweep of elections over a grid of candidate and voter counts, and saves the averages of every grid cell, with
+    the half-widths of their confidence intervals, as one row of the result store sweep_results.npz in the data folder
+
+    With a precision, a cell stops running elections as soon as the confidence intervals of all its metrics are
+    narrower than the precision, so tests is only the maximum number of elections of a cell. Cells whose metrics hardly
+    vary then need far fewer elections than noisy cells. The intervals are checked after every chunk, so cells stop at
+    a multiple of the chunk size, and the chunk size is part of the checkpoint key of every sampled cell
+
+    With an exact threshold, cells with at most that many anonymous profiles are not sampled at all. Their averages are
+    the exact expectations over all anonymous profiles, see run_exact_chunk, which for small cells is also faster than
+    sampling them
+
+    Every completed cell is checkpointed in the checkpoints folder of the data folder, under a hash of its voting
+    scheme, size, number of tests, seed and code version. Running a sweep again with the same seed, for example after
+    it was interrupted, only computes the cells that are missing
+
+    :param data_folder: A string indicating the folder in which the result store is saved
+    :param tests: An integer indicating the (maximum) number of elections per grid cell
+    :param voting_scheme: A string indicating the type of voting
+    :param show_atva_features: A boolean indicating whether the advanced TVA should be run
+    :param workers: An integer indicating the number of worker processes, the sweep runs serially if it is 1
+    :param chunk_size: An integer indicating the maximum number of elections per work unit
+    :param seed: An integer indicating the root seed of the sweep. If None, the seed of an earlier sweep in the data
+    folder is reused, or drawn randomly (and printed) the first time. The results only depend on the seed, not on the
+    number of workers
+    :param precision: A float indicating the largest allowed half-width of the confidence intervals, in percentage
+    points of the metrics, or None to run all tests of every cell
+    :param confidence: A float indicating the confidence level of the intervals
+    :param min_tests: An integer indicating the number of elections a cell runs before it can stop early
+    :param exact_threshold: An integer indicating the largest number of anonymous profiles of a cell that is computed
+    exactly, or None to sample every cell
+    :return: void
+    """
 
     print("##########################TESTS########################################")
 
     n_voters_test = [2, 3, 4, 5, 6, 7, 8, 9, 10, 15, 20, 30, 50]
     n_candidates_test = [3, 4, 5, 6, 7, 8, 9, 10]
 
-    print(f"Running tests for {voting_scheme}...")
+    checkpoint = CellCheckpoint(os.path.join(data_folder, "checkpoints"))
+
+    seed = checkpoint.get_seed(seed)
 
-    for curr_n_candidates in n_candidates_test:
-        n_candidates = curr_n_candidates
-        for curr_n_voters in n_voters_test:
-            n_voters = curr_n_voters
+    print(f"Running tests for {voting_scheme} with {workers} worker(s) and seed {seed}...")
 
-            print(f"Running for {n_candidates} candidates with {curr_n_voters} voters")
+    is_done = None
+    stopping_rule = None
+    if precision is not None:
+        is_done = partial(is_precise, precision=precision, confidence=confidence, min_tests=min_tests)
+        # The rule is checked after every chunk, so the trials a cell stops at also depend on the chunk size
+        stopping_rule = {"precision": precision, "confidence": confidence, "min_tests": min_tests,
+                         "chunk_size": chunk_size}
 
-            j, k = 0, 0
-            total_basic_overall_happiness = {"H_p": 0, "H_si": 0}
-            total_risk_percentage_my_preference = 0
-            total_risk_percentage_social_outcome = 0
-            total_basic_happiness_increase = {"H_p": 0, "H_si": 0}
-            total_conc_overall_happiness = {"H_p": 0, "H_si": 0}
-            total_conc_voting_happiness_increases = {"H_p": 0, "H_si": 0}
-            counter_voting_dict_overall = {"H_p": 0, "H_si": 0}
-            counter_voting_dict_increases = {"H_p": 0, "H_si": 0}
+    rows = []
+    cells = []
+    exact_cells = {}
+    cell_keys = {}
 
-            for i in range(tests):
+    for n_candidates in n_candidates_test:
+        for n_voters in n_voters_test:
+            # The anonymous profiles are only counted when the cell may be enumerated
+            n_profiles = count_anonymous_profiles(n_candidates, n_voters) if exact_threshold is not None else None
 
-                election_results = create_and_run_election(n_voters, n_candidates, voting_scheme, show_atva_features)
+            is_exact = n_profiles is not None and n_profiles <= exact_threshold
 
-                for key in election_results[0]:
-                    total_basic_overall_happiness[key] += election_results[0][key]
+            # Exact results depend neither on the seed nor on the number of tests
+            if is_exact:
+                cell = (n_candidates, n_voters, voting_scheme, show_atva_features)
+                cell_keys[cell] = get_cell_key(voting_scheme, n_candidates, n_voters, None, None, show_atva_features,
+                                               exact=True)
+            else:
+                cell = (n_candidates, n_voters, voting_scheme, show_atva_features, seed)
+                cell_keys[cell] = get_cell_key(voting_scheme, n_candidates, n_voters, tests, seed, show_atva_features,
+                                               stopping_rule)
+
+            totals = checkpoint.load(cell_keys[cell])
 
-                total_risk_percentage_my_preference += election_results[1]
-                total_risk_percentage_social_outcome += election_results[2]
+            if totals is not None:
+                rows.append(get_cell_row(cell, totals, confidence))
+            elif is_exact:
+                exact_cells[cell] = n_profiles
+            else:
+                cells.append(cell)
 
-                for key in election_results[3]:
-                    elect_3 = election_results[3][key]
-                    total_basic_happiness_increase[key] += elect_3
+    print(f"{len(rows)} cells were already done, {len(exact_cells)} cells are left to enumerate and {len(cells)} "
+          f"cells are left to sample")
 
-                for key in election_results[4]:
-                    elect_4 = election_results[4][key]
-                    total_conc_overall_happiness[key] += elect_4
+    sweeps = [run_sweep(run_exact_chunk, list(exact_cells), exact_cells, workers, chunk_size),
+              run_sweep(run_test_chunk, cells, tests, workers, chunk_size, is_done)]
 
-                for key in election_results[5]:
-                    elect_5 = election_results[5][key]
-                    total_conc_voting_happiness_increases[key] += elect_5
+    for sweep in sweeps:
+        for cell, totals in sweep:
 
-                for key in election_results[6]:
-                    elect_6 = election_results[6][key]
-                    if elect_6 is not None:
-                        counter_voting_dict_overall[key] += elect_6
-                        if key == "percentage_my_preference":
-                            j += 1
-                        else:
-                            k += 1
-
-                for key in election_results[7]:
-                    elect_7 = election_results[7][key]
-                    if elect_7 is not None:
-                        counter_voting_dict_increases[key] += elect_7
-
-            if not os.path.exists(data_folder + voting_scheme):
-                os.mkdir(data_folder + voting_scheme)
-
-            with open(data_folder + voting_scheme + "/results_" + voting_scheme + "_n_candidates_" + str(
-                            n_candidates) + "_n_voters_" + str(n_voters) + ".txt", "w") as out_file:
-
-                out_file.write("Voting Scheme: " + voting_scheme)
-                out_file.write("\n")
-
-                basic_average_overall_happiness = {}
-                for key in total_basic_overall_happiness:
-                    basic_average_overall_happiness[key] = total_basic_overall_happiness[key] / tests
-
-                out_file.write("basic_average_overall_happiness")
-                out_file.write("\n")
-                out_file.write(str(basic_average_overall_happiness))
-                out_file.write("\n")
-
-                out_file.write("Average tactical voting risk for percentage_my_preference: ")
-                out_file.write("\n")
-                out_file.write(str(total_risk_percentage_my_preference / tests))
-                out_file.write("\n")
-                out_file.write("Average tactical voting risk for percentage_social_index: ")
-                out_file.write("\n")
-                out_file.write(str(total_risk_percentage_social_outcome / tests))
-                out_file.write("\n")
-
-                basic_average_happiness_increase = {}
-                for key in total_basic_happiness_increase:
-                    basic_average_happiness_increase[key] = total_basic_happiness_increase[key] / tests
-
-                out_file.write("basic_average_happiness_increase")
-                out_file.write("\n")
-                out_file.write(str(basic_average_happiness_increase))
-                out_file.write("\n")
-
-                conc_average_overall_happiness = {}
-                for key in total_conc_overall_happiness:
-                    conc_average_overall_happiness[key] = total_conc_overall_happiness[key] / tests
-
-                out_file.write("conc_average_overall_happiness")
-                out_file.write("\n")
-                out_file.write(str(conc_average_overall_happiness))
-                out_file.write("\n")
-
-                conc_average_voting_happiness_increases = {}
-                for key in total_conc_voting_happiness_increases:
-                    conc_average_voting_happiness_increases[key] = total_conc_voting_happiness_increases[key] / tests
-
-                out_file.write("conc_average_voting_happiness_increases")
-                out_file.write("\n")
-                out_file.write(str(conc_average_voting_happiness_increases))
-                out_file.write("\n")
-
-                counter_average_voting_dict_overall = {}
-                for key in counter_voting_dict_overall:
-                    if key == "percentage_my_preference" and j != 0:
-                        counter_average_voting_dict_overall[key] = counter_voting_dict_overall[key] / j
-                    elif k != 0:
-                        counter_average_voting_dict_overall[key] = counter_voting_dict_overall[key] / k
-
-                out_file.write("counter_average_voting_dict_overall")
-                out_file.write("\n")
-                out_file.write(str(counter_average_voting_dict_overall))
-                out_file.write("\n")
-
-                counter_average_voting_dict_increases = {}
-                for key in counter_voting_dict_increases:
-                    if key == "percentage_my_preference" and j != 0:
-                        counter_average_voting_dict_increases[key] = counter_voting_dict_increases[key] / j
-                    elif k != 0:
-                        counter_average_voting_dict_increases[key] = counter_voting_dict_increases[key] / k
-
-                out_file.write("counter_average_voting_dict_increases")
-                out_file.write("\n")
-                out_file.write(str(counter_average_voting_dict_increases))
-                out_file.write("\n")
-
-                out_file.write(str(j) + ", " + str(k))
-
-    print(f"Tests were run for {voting_scheme}, and saved in {data_folder+voting_scheme}")
+            print(f"Finished {cell[0]} candidates with {cell[1]} voters after {totals['tests']} elections")
+
+            checkpoint.save(cell_keys[cell], totals)
+            rows.append(get_cell_row(cell, totals, confidence))
+
+    # Cells finish in any order, the store keeps them in grid order
+    rows.sort(key=lambda row: (row["voting_scheme"], row["n_candidates"], row["n_voters"]))
+
+    results_path = os.path.join(data_folder, "sweep_results.npz")
+    save_results(results_path, rows)
+
+    print(f"Tests were run for {voting_scheme}, and saved in {results_path}")
+
+
+def get_cell_row(cell, totals, confidence=0.95):
+    """
+    Creates the row of the result store for a grid cell of the test sweep
+
+    :param cell: A tuple with the arguments of run_test_chunk or run_exact_chunk for the cell
+    :param totals: A dictionary of partial results of all trials of the cell
+    :param confidence: A float indicating the confidence level of the intervals
+    :return: Returns a dictionary with a value for every column of the result store
+    """
+    n_candidates, n_voters, voting_scheme = cell[0], cell[1], cell[2]
+
+    return {"voting_scheme": voting_scheme, "n_candidates": n_candidates, "n_voters": n_voters,
+            "tests": totals["tests"], **get_cell_averages(totals, confidence)}
 
 
 if __name__ == "__main__":
@@ -587,6 +811,7 @@ if __name__ == "__main__":
     candidates = "ABCDEFGIJK"
 
     # Voting schemes must be written out with the first letter capitalised; Plurality, AntiPlurality, VotingForTwo, Borda
+    # Other positional schemes declared in POSITIONAL_RULES (ThreeApproval, TruncatedBorda, Dowdall) can be used as well
     voting_scheme = "Borda"
     voters = 3
 
@@ -602,7 +827,10 @@ if __name__ == "__main__":
 
         tests = 2
 
-        run_tests(data_folder, tests, voting_scheme, show_atva_features)
+        # Number of processes the sweep is spread over
+        workers = 1
+
+        run_tests(data_folder, tests, voting_scheme, show_atva_features, workers)
 
     # In order to visualise results, please run mas_visualization.ipynb in a Jupyter environment
     # The notebook requires tests to be run for all voting schemes
@@ -0,0 +1,115 @@
+from agents.agent import Agent
+from voting.voting_schemes import get_voting_scheme
+
+
+class ElectionSnapshot:
+    """
+    Class for an immutable snapshot of an election
+
+    A snapshot has the same interface the voting schemes use of a TVA object, but is never modified once it is
+    created. Counter voting and concurrent voting ask what happens if some agents cast another ballot. Instead of
+    overwriting the preferences of those agents and the results of the election, and restoring them afterwards, they
+    derive a new snapshot that overrides the ballots and results, and shares everything else with the snapshot it was
+    derived from. Snapshots can therefore be used by many threads at once, and can be sent to other processes
+
+    The profile of a snapshot always holds the true preferences of the agents, which is what the happiness of every
+    outcome is measured against, while the agents and the results follow the ballots that are cast
+    """
+
+    __slots__ = ("candidates", "voting_scheme", "profile", "results", "tactical_cache", "base_agents", "overrides",
+                 "agents")
+
+    def __init__(self, candidates, voting_scheme, profile, results, agents, tactical_cache=None, overrides=None):
+        """
+        Constructor for an election snapshot
+
+        :param candidates: A dictionary of the candidates in the election, with all their votes set to 0
+        :param voting_scheme: A string indicating the type of voting
+        :param profile: A preference profile object with the true preferences of the agents
+        :param results: A dictionary of results of the election, which must not be modified afterwards
+        :param agents: A list of agent objects, as cast before any override
+        :param tactical_cache: A tactical cache shared by all snapshots of the election, or None to not cache
+        :param overrides: A dictionary with the agent object that replaces an agent, by index, or None for no overrides
+        """
+        self.candidates = candidates
+        self.voting_scheme = voting_scheme
+        self.profile = profile
+        self.results = results
+        self.tactical_cache = tactical_cache
+        self.base_agents = agents
+        self.overrides = overrides if overrides is not None else {}
+
+        # The list of agents with overrides is only built when it is asked for
+        self.agents = None if self.overrides else agents
+
+    @property
+    def scheme(self):
+        """
+        :return: Returns the class of the voting scheme of the election
+        """
+        return get_voting_scheme(self.voting_scheme)
+
+    def get_agents(self):
+        """
+        :return: Returns a list of agent objects in the election, with their overridden ballots
+        """
+        agents = self.agents
+
+        if agents is None:
+            agents = list(self.base_agents)
+            for index, agent in self.overrides.items():
+                agents[index] = agent
+            self.agents = agents
+
+        return agents
+
+    def get_profile(self):
+        """
+        :return: Returns the preference profile of the agents in the election
+        """
+        return self.profile
+
+    def with_results(self, results):
+        """
+        Derives a snapshot of the election with other results, and the same ballots
+
+        :param results: A dictionary of results, which must not be modified afterwards
+        :return: Returns an election snapshot object
+        """
+        return ElectionSnapshot(self.candidates, self.voting_scheme, self.profile, results, self.base_agents,
+                                self.tactical_cache, self.overrides)
+
+    def with_ballot(self, index, preference_list, results=None):
+        """
+        Derives a snapshot of the election in which one agent casts another ballot. The ballots of all other agents are
+        shared with this snapshot, and the new results only take the old ballot of the agent out and add the new one
+
+        :param index: An integer indicating the index of the agent in the election
+        :param preference_list: A list of candidates in the order of the new ballot
+        :param results: A dictionary of results of the election with the new ballot, if they are already known
+        :return: Returns an election snapshot object
+        """
+        scheme = self.scheme
+        agent = self.overrides.get(index, self.base_agents[index])
+
+        new_agent = Agent(agent.name, "".join(preference_list), scheme)
+
+        if results is None:
+            results = scheme().add_personal_votes(scheme().get_remainder(agent, self), new_agent.preferences)
+
+        overrides = dict(self.overrides)
+        overrides[index] = new_agent
+
+        return ElectionSnapshot(self.candidates, self.voting_scheme, self.profile, results, self.base_agents,
+                                self.tactical_cache, overrides)
+
+    def get_overall_happiness(self):
+        """
+        Computes the overall happiness of the results of the snapshot, which is the average happiness of all agents
+        with their true preferences
+
+        :return: Returns a dictionary with the average of each type of happiness
+        """
+        happinesses = self.profile.get_happinesses(self.profile.to_vector(self.results))
+
+        return {key: happinesses[key].mean().item() for key in happinesses}
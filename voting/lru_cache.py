@@ -0,0 +1,99 @@
+from collections import OrderedDict
+from threading import Lock
+
+
+class LRUCache:
+    """
+    Class for a cache that evicts its entries in least recently used order once it is full
+
+    The cache can be shared by threads, every lookup and update holds a lock. When the cache is sent to another
+    process, only its size is sent and the other process starts with an empty cache. Subclasses decide what is cached,
+    and how the keys of their entries are created
+    """
+
+    def __init__(self, max_size):
+        """
+        Constructor for the cache
+
+        :param max_size: An integer indicating the maximum number of entries to keep
+        """
+        self.max_size = max_size
+        self.entries = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+        self.lock = Lock()
+
+    def __getstate__(self):
+        """
+        :return: Returns the state of the cache that is sent to other processes, which is only its maximum size
+        """
+        return {"max_size": self.max_size}
+
+    def __setstate__(self, state):
+        """
+        Restores a cache that was sent from another process, as an empty cache of the same size
+
+        :param state: A dictionary, as returned by __getstate__
+        :return: void
+        """
+        LRUCache.__init__(self, state["max_size"])
+
+    def get(self, key):
+        """
+        Looks up an entry, and marks it as recently used
+
+        :param key: A hashable key of the entry
+        :return: Returns the cached value, or None if the key was not cached
+        """
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self.entries.move_to_end(key)
+
+            return self.entries[key]
+
+    def peek(self, key):
+        """
+        Looks up an entry without counting it as a hit or miss, or marking it as recently used
+
+        :param key: A hashable key of the entry
+        :return: Returns the cached value, or None if the key was not cached
+        """
+        with self.lock:
+            return self.entries.get(key)
+
+    def put(self, key, value):
+        """
+        Caches a value, evicting the least recently used entry if the cache is full
+
+        :param key: A hashable key of the entry
+        :param value: The value to cache
+        :return: void
+        """
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+
+            if len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def invalidate(self):
+        """
+        Removes all cached entries
+
+        :return: void
+        """
+        with self.lock:
+            self.entries.clear()
+
+    def get_statistics(self):
+        """
+        :return: Returns a dictionary with the number of hits, misses and cached entries, read at the same moment
+        """
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self.entries)}
@@ -0,0 +1,34 @@
+from voting.lru_cache import LRUCache
+
+
+class TacticalCache(LRUCache):
+    """
+    Class for a cache of tactical options
+
+    Searching for tactical options only depends on the voting scheme, the preferences of the agent and the tallied
+    votes of all other agents. Counter voting and concurrent voting repeat the same searches many times within one run
+    of the TVA, so their results are kept here and evicted in least recently used order once the cache is full
+
+    The cache is emptied with invalidate whenever the agents of the election change, since the overall happiness of
+    every tactical option depends on all of them
+    """
+
+    def __init__(self, max_size=4096):
+        """
+        Constructor for the tactical cache
+
+        :param max_size: An integer indicating the maximum number of tactical searches to keep
+        """
+        super().__init__(max_size)
+
+    @staticmethod
+    def get_key(scheme, agent, remainder):
+        """
+        Creates the cache key of a tactical search
+
+        :param scheme: A voting scheme object
+        :param agent: The agent object for which tactical voting is applied
+        :param remainder: A dictionary with the tallied votes of all other agents
+        :return: Returns a hashable tuple of (scheme, agent preferences, remainder tally)
+        """
+        return type(scheme).__name__, tuple(agent.preferences), tuple(remainder.items())
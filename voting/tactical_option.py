@@ -0,0 +1,93 @@
+class TacticalOption:
+    """
+    Class for a tactical option
+
+    A tactical option is the preference list an agent can vote with instead of their true preferences, and its effect
+    on the election. Instead of a full copy of the results, an option keeps the results of the election it was found
+    in, which are shared by all of its options, and only the votes of the candidates that changed. The overall
+    happiness of an option needs the happiness of every agent, so it is only computed when it is used
+
+    For compatibility with the lists that tactical options used to be, an option can be indexed as:
+    0 - new preference list
+    1 - new winner
+    2 - new voting outcome (dictionary of results)
+    3 - new happiness of the agent (dictionary per type of happiness)
+    4 - new overall happiness (dictionary per type of happiness)
+    """
+
+    __slots__ = ("ballot", "winner", "base_results", "changes", "happiness", "profile", "overall_happiness")
+
+    def __init__(self, preference_list, winner, results, happiness, base_results, profile):
+        """
+        Constructor for a tactical option
+
+        :param preference_list: A list of candidates in the tactical preference order
+        :param winner: A string indicating the winner of the election with the tactical vote
+        :param results: A dictionary of results of the election with the tactical vote
+        :param happiness: A dictionary with the happiness of the agent per type of happiness
+        :param base_results: A dictionary of results of the election without the tactical vote, which must not be
+        modified afterwards
+        :param profile: A preference profile object with the (true) preferences of all agents of the election
+        """
+        self.ballot = tuple(preference_list)
+        self.winner = winner
+        self.base_results = base_results
+        self.changes = {candidate: votes for candidate, votes in results.items() if votes != base_results[candidate]}
+        self.happiness = (happiness["H_p"], happiness["H_si"])
+        self.profile = profile
+        self.overall_happiness = None
+
+    def get_preference_list(self):
+        """
+        :return: Returns a list of candidates in the tactical preference order
+        """
+        return list(self.ballot)
+
+    def get_results(self):
+        """
+        :return: Returns a new dictionary of results of the election with the tactical vote
+        """
+        results = dict(self.base_results)
+        results.update(self.changes)
+
+        return results
+
+    def get_happiness(self):
+        """
+        :return: Returns a dictionary with the happiness of the agent per type of happiness
+        """
+        return {"H_p": self.happiness[0], "H_si": self.happiness[1]}
+
+    def get_overall_happiness(self):
+        """
+        :return: Returns a dictionary with the overall happiness per type of happiness
+        """
+        if self.overall_happiness is None:
+            happinesses = self.profile.get_happinesses(self.profile.to_vector(self.get_results()))
+            self.overall_happiness = (happinesses["H_p"].mean().item(), happinesses["H_si"].mean().item())
+
+        return {"H_p": self.overall_happiness[0], "H_si": self.overall_happiness[1]}
+
+    def __getitem__(self, index):
+        """
+        :param index: An integer between 0 and 4, see the class description
+        :return: Returns the field of the option at the index
+        """
+        if index == 0:
+            return self.get_preference_list()
+        if index == 1:
+            return self.winner
+        if index == 2:
+            return self.get_results()
+        if index == 3:
+            return self.get_happiness()
+        if index == 4:
+            return self.get_overall_happiness()
+
+        raise IndexError("A tactical option has 5 fields")
+
+    def __len__(self):
+        """
+        :return: Returns the number of fields of a tactical option
+        """
+        return 5
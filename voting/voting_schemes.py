@@ -1,34 +1,35 @@
 from abc import ABC, abstractmethod
 from copy import copy
-from agents.agent import get_winner, Agent
+from functools import partial
+from itertools import islice
+from math import lcm
+from agents.agent import get_winner
+from agents.preference_profile import get_happiness_arrays, get_tie_order, get_winner_indices
 from strategies import strategies_borda
+from voting.tactical_option import TacticalOption
+import numpy as np
 import sys
 
-'''
-TO DO: move get_tactical_overall_happiness anywhere else where it makes sense, for now it's here just for convenience sake
-'''
 
+def get_best_option(options, key):
+    """
+    Gets the option with the highest happiness of the agent, where the first option wins ties. Options are only taken
+    from the iterable until one makes the agent fully happy, since no option can do better
 
-def get_tactical_overall_happiness(tva_object, agent, agent_happiness, results_copy):
-    happinesses = {}
+    :param options: An iterable of tactical option objects
+    :param key: A string indicating the type of happiness
+    :return: Returns a tactical option object, or None if there are no options
+    """
+    best_option = None
 
-    for other_agent in tva_object.get_agents():
-        if other_agent != agent:
-            other_happiness = other_agent.get_happiness(results_copy)
-            for key in other_happiness:
-                if key not in happinesses:
-                    happinesses[key] = []
-                happinesses[key].append(other_happiness[key])
-        else:
-            for key in agent_happiness:
-                if key not in happinesses:
-                    happinesses[key] = []
-                happinesses[key].append(agent_happiness[key])
+    for option in options:
+        if best_option is None or option[3][key] > best_option[3][key]:
+            best_option = option
 
-    for key in happinesses:
-        happinesses[key] = sum(happinesses[key]) / len(happinesses[key])
+            if option[3][key] >= 100:
+                break
 
-    return happinesses
+    return best_option
 
 
 class VotingScheme(ABC):
@@ -55,93 +56,318 @@ class VotingScheme(ABC):
 
         return candidate_dict
 
+    def run_profile(self, candidates, profile):
+        """
+        This function tallies the overall votes for all the candidates, based on a preference profile. The whole tally
+        is a single product of the score vector of the scheme with the position counts of the profile
+
+        :param candidates: A dictionary of the candidates in the election
+        :param profile: A preference profile object
+        :return: Returns a dictionary of the tallied votes for each candidate
+        """
+        tally = self.get_scores(profile.num_candidates) @ profile.get_position_counts()
+
+        candidate_dict = copy(candidates)
+
+        for candidate, votes in profile.to_results(tally).items():
+            candidate_dict[candidate] += votes
+
+        return candidate_dict
+
+    def get_scores(self, num_candidates):
+        """
+        :param num_candidates: An integer indicating the number of candidates in the election
+        :return: Returns the score vector of the scheme as a numpy array
+        """
+        return np.array(self.score_vector(num_candidates))
+
     @abstractmethod
+    def score_vector(self, num_candidates):
+        """
+        Abstract method for the voting schemes. Every positional voting scheme is described by its score vector, where
+        the i-th element is the score a candidate receives for being in the i-th position of a preference list
+
+        :param num_candidates: An integer indicating the number of candidates in the election
+        :return: Returns a list of scores, one per position
+        """
+        pass
+
     def tally_personal_votes(self, preferences):
         """
-        Abstract method for the voting schemes. Requires a dictionary of personal preferences from an agent
+        Tallies the personal votes of an agent using the score vector of the scheme
         It modifies the preference dictionary of a user
 
         :param preferences: A dictionary of an agent's preferences
         :return: void
         """
-        pass
+        scores = self.score_vector(len(preferences))
+
+        for key, score in zip(preferences, scores):
+            preferences[key] += score
 
-    def counter_ts_by_key(self, key, agent, other_agent, tva_object_copy, all_other_agents):
+    def get_remainder(self, agent, tva_object):
         """
-        Returns a list containing an opposing agent to the agent of interest. The list contains the
-        opposing agent, with their best tactical preference, the resulting outcome, and the
-        possible tactical options of the agent to counter
+        Computes the tallied votes of all other agents, by taking the personal votes of an agent out of the results of
+        the election. This way, the results do not have to be tallied again for every tactical preference list
+
+        :param agent: An agent object
+        :param tva_object: A TVA object
+        :return: Returns a dictionary with the tallied votes of all agents except the given agent
+        """
+        remainder = copy(tva_object.results)
+
+        for candidate in agent.preferences:
+            remainder[candidate] -= agent.preferences[candidate]
+
+        return remainder
+
+    def add_personal_votes(self, remainder, personal_votes):
+        """
+        Adds the personal votes of an agent to the tallied votes of all other agents
+
+        :param remainder: A dictionary with the tallied votes of all other agents
+        :param personal_votes: A dictionary of the tallied preferences of an agent
+        :return: Returns a dictionary of results
+        """
+        new_results = copy(remainder)
+
+        for candidate in personal_votes:
+            new_results[candidate] += personal_votes[candidate]
 
+        return new_results
+
+    def evaluate_personal_votes(self, agent, tva_object, remainder, personal_votes_list):
+        """
+        Evaluates many tactical ballots of an agent at once. The personal votes of all ballots are stacked into one
+        (ballots x candidates) score matrix, which is added to the tallied votes of all other agents in one broadcast,
+        and the winners and the position of the first preference of the agent in every result come out of one
+        vectorized pass
+
+        :param agent: The agent object for which tactical voting is applied
+        :param tva_object: A TVA object
+        :param remainder: A dictionary with the tallied votes of all other agents
+        :param personal_votes_list: A list of dictionaries of tallied preferences, one per tactical ballot
+        :return: Returns a list of tactical option objects, one per tactical ballot
+        """
+        profile = tva_object.get_profile()
+        candidates = profile.candidate_string
+        m = profile.num_candidates
+
+        scores = np.array([[personal_votes[candidate] for candidate in candidates]
+                           for personal_votes in personal_votes_list])
+        tallies = profile.to_vector(remainder) + scores
+        winners = [candidates[winner] for winner in get_winner_indices(tallies, profile.tie_order).tolist()]
+
+        # H_si follows from the position of the first preference in the sorted results, where ties keep the order of
+        # the candidate string
+        first = candidates.index(agent.get_ballot_type()[0])
+        first_votes = tallies[:, first:first + 1]
+        positions = (tallies > first_votes).sum(axis=1) + (tallies[:, :first] == first_votes).sum(axis=1)
+
+        return [TacticalOption(list(personal_votes), winner, dict(zip(candidates, tally)),
+                               {"H_p": (m - 1 - agent.get_rank(winner)) / (m - 1) * 100,
+                                "H_si": (m - 1 - position) / (m - 1) * 100},
+                               tva_object.results, profile)
+                for personal_votes, winner, tally, position in zip(personal_votes_list, winners, tallies.tolist(),
+                                                                    positions.tolist())]
+
+    def tally_preference_list(self, remainder, pref_list):
+        """
+        Adds the votes of a preference list to the tallied votes of all other agents
+
+        :param remainder: A dictionary with the tallied votes of all other agents
+        :param pref_list: A list of candidates in preference order
+        :return: Returns a dictionary of results
+        """
+        return self.add_personal_votes(remainder, dict(zip(pref_list, self.score_vector(len(pref_list)))))
+
+    def get_tactical_options(self, agent, tva_object):
+        """
+        Gets the tactical options of an agent, using the tactical cache of the TVA object. Identical searches, with
+        the same preferences and the same tallied votes of all other agents, are only computed once
+
+        Callers must not modify the returned dictionary, since it may be shared with other callers
+
+        :param agent: The agent object for which tactical voting must be applied
+        :param tva_object: A TVA object
+        :return: Returns a dictionary of several tactical voting strategies the agent can apply
+        """
+        cache = getattr(tva_object, "tactical_cache", None)
+
+        if cache is None:
+            return self.tactical_options(agent, tva_object)
+
+        key = cache.get_key(self, agent, self.get_remainder(agent, tva_object))
+        tactical_set = cache.get(key)
+
+        if tactical_set is None:
+            tactical_set = self.tactical_options(agent, tva_object)
+            cache.put(key, tactical_set)
+
+        return tactical_set
+
+    def iterate_tactical_options(self, agent, tva_object, key):
+        """
+        Iterates over the tactical options of an agent for one type of happiness. Voting schemes that can search their
+        options one by one override this, so that a caller that stops early also stops the search
+
+        :param agent: The agent object for which tactical voting must be applied
+        :param tva_object: A TVA object
         :param key: A string indicating the type of happiness
-        :param agent: An agent object, for whom the counter tactical votes must be made
-        :param other_agent: An agent object, who is the opposing agent
-        :param tva_object_copy: A copy of the original tva object
-        :param all_other_agents: A list of agent objects, excluding the opposing agent, and agent of interest
-        :return: Returns a list as mentioned above. Type = [str, list, list, dict]
+        :return: Yields tactical option objects
         """
+        yield from self.get_tactical_options(agent, tva_object)[key].values()
 
-        other_tactical_options = self.tactical_options(other_agent, tva_object_copy)
+    def best_tactical_option(self, agent, tva_object, key):
+        """
+        Gets the tactical option that makes an agent the happiest, see get_best_option
 
-        # Hold original values to reset later
-        original_options = other_agent.preferences
-        original_results = tva_object_copy.results
+        :param agent: The agent object for which tactical voting must be applied
+        :param tva_object: A TVA object
+        :param key: A string indicating the type of happiness
+        :return: Returns a tactical option object, or None if the agent has no tactical options
+        """
+        return get_best_option(self.iterate_tactical_options(agent, tva_object, key), key)
 
-        percentage_happiness_options = other_tactical_options[key]
+    def get_best_tactical_happinesses(self, tva_object):
+        """
+        Gets the highest happiness every agent of an election can reach by voting tactically
 
-        # If other agent has no tactical options, nothing to do
-        if len(percentage_happiness_options) < 1:
-            return [other_agent, None, None, None]
+        :param tva_object: A TVA object
+        :return: Returns a dictionary with, per type of happiness, a numpy array with the best tactical happiness of
+        every agent, which is NaN for agents without tactical options
+        """
+        profile = tva_object.get_profile()
 
-        best_option = None
-        best_happiness = 0
+        # Voting schemes with a vectorized search handle the election as a batch of one
+        batch_happinesses = self.get_batch_best_tactical_happinesses(profile.candidate_string,
+                                                                     profile.ballots[np.newaxis],
+                                                                     profile.ranks[np.newaxis],
+                                                                     profile.to_vector(tva_object.results)[np.newaxis])
+        if batch_happinesses is not None:
+            return {key: batch_happinesses[key][0] for key in batch_happinesses}
 
-        # Get the best tactical option of the other agent
-        for option in percentage_happiness_options:
+        agents = tva_object.get_agents()
+        best_happinesses = {"H_p": np.full(len(agents), np.nan), "H_si": np.full(len(agents), np.nan)}
+        best_by_type = {}
 
-            sublist = percentage_happiness_options[option]
-            happiness = sublist[3][key]
+        # Agents with the same ballot type have the same tactical options, which are only searched once per type
+        for i, agent in enumerate(agents):
 
-            if happiness > best_happiness:
-                best_option = percentage_happiness_options[option]
-                best_happiness = happiness
+            ballot_type = agent.get_ballot_type()
 
-        '''
-        TO DO: make the following work when best_option is never updated and is None
-        '''
+            if ballot_type not in best_by_type:
+                best_by_type[ballot_type] = {key: self.best_tactical_option(agent, tva_object, key)
+                                             for key in best_happinesses}
 
-        best_preference = best_option[0]
+            for key, best_option in best_by_type[ballot_type].items():
+                if best_option is not None:
+                    best_happinesses[key][i] = best_option[3][key]
 
-        # Get the personal tally if the other agent had chosen their best tactical option
-        best_preference_dictionary = {}
-        for preference in best_preference:
-            best_preference_dictionary[preference] = 0
+        return best_happinesses
 
-        self.tally_personal_votes(best_preference_dictionary)
-        other_agent.preferences = best_preference_dictionary
+    def get_batch_best_tactical_happinesses(self, candidate_string, ballots, ranks, tallies):
+        """
+        Gets the highest happiness every agent of many elections can reach by voting tactically, in one vectorized
+        pass. Voting schemes that cannot do this return None, and the elections are then searched one by one with
+        get_best_tactical_happinesses
+
+        :param candidate_string: A string of candidates, for example: "ABCDEFG"
+        :param ballots: A (trials x voters x candidates) numpy array with the candidate indices in preference order
+        :param ranks: A (trials x voters x candidates) numpy array with the position of every candidate
+        :param tallies: A (trials x candidates) numpy array with the votes of each candidate
+        :return: Returns None, or a dictionary with a (trials x voters) numpy array per type of happiness
+        """
+        return None
 
-        new_list_agents = [agent, other_agent]
-        for i in all_other_agents:
-            if not i == other_agent:
-                new_list_agents.append(i)
+    def get_swap_outcomes(self, tallies, tie_order):
+        """
+        Computes the outcome of many elections for every way an agent can move one vote from one candidate to another.
+        This is the effect of swapping two positions of a ballot in schemes that only give scores of 0 and 1, see
+        get_batch_best_tactical_happinesses. The outcomes only depend on the two candidates, so they are computed once
+        per election instead of once per agent
+
+        :param tallies: A (trials x candidates) numpy array with the votes of each candidate
+        :param tie_order: A numpy array with the candidate indices in alphabetical order
+        :return: Returns a tuple of a (trials x gains x losses) numpy array with the winner of every outcome, and a
+        (trials x gains x losses x candidates) numpy array with the position of every candidate in the sorted results
+        of every outcome, where ties keep the order of the candidate string
+        """
+        m = tallies.shape[-1]
+        moves = np.eye(m, dtype=tallies.dtype)
 
-        # Get the social outcome if the other agent had chosen their best tactical option
-        new_results = self.run_scheme(tva_object_copy.candidates, new_list_agents)
-        new_results_list = sorted(new_results, key=new_results.get, reverse=True)
-        tva_object_copy.results = new_results
+        # A candidate that gains and loses a vote keeps its votes
+        outcomes = tallies[:, np.newaxis, np.newaxis, :] + moves[:, np.newaxis, :] - moves[np.newaxis, :, :]
 
-        # Depending on the new social outcome, compute the agent's new tactical options
-        counter_tactical_set = [other_agent, list(best_preference_dictionary.keys()),
-                                new_results_list,
-                                self.tactical_options(agent, tva_object_copy)[key],
-                                new_results]
+        positions = np.empty(outcomes.shape, dtype=np.intp)
+        np.put_along_axis(positions, np.argsort(-outcomes, axis=-1, kind="stable"), np.arange(m, dtype=np.intp),
+                          axis=-1)
 
-        # Reset to defaults so future elections aren't hindered by these changes
-        tva_object_copy.results = original_results
-        other_agent.preferences = original_options
+        return get_winner_indices(outcomes, tie_order), positions
 
-        return counter_tactical_set
+    def get_swap_happinesses(self, ballots, ranks, swap_outcomes, gains, losses):
+        """
+        Looks up the outcome for every agent of many elections, if the agent moves one vote from one candidate to
+        another, see get_swap_outcomes
+
+        :param ballots: A (trials x voters x candidates) numpy array with the candidate indices in preference order
+        :param ranks: A (trials x voters x candidates) numpy array with the position of every candidate
+        :param swap_outcomes: A tuple of winners and positions, as returned by get_swap_outcomes
+        :param gains: A (trials x voters) numpy array with the candidate that gains a vote from every agent
+        :param losses: A (trials x voters) numpy array with the candidate that loses a vote from every agent
+        :return: Returns a tuple of a (trials x voters) numpy array with the winner of every outcome, and a dictionary
+        with a (trials x voters) numpy array of happiness values per type of happiness
+        """
+        winners, positions = swap_outcomes
+        trials, n_voters, m = ballots.shape
+
+        trial_indices = np.arange(trials)[:, np.newaxis]
+        new_winners = winners[trial_indices, gains, losses]
+
+        winner_ranks = ranks[trial_indices, np.arange(n_voters), new_winners]
+        first_positions = positions[trial_indices, gains, losses, ballots[..., 0]]
+
+        return new_winners, {"H_p": (m - 1 - winner_ranks) / (m - 1) * 100,
+                             "H_si": (m - 1 - first_positions) / (m - 1) * 100}
 
-    def counter_vote(self, agent, tva_object_copy):
+    def counter_ts_by_key(self, key, agent, other_index, tva_object):
+        """
+        Returns a list containing an opposing agent to the agent of interest. The list contains the
+        opposing agent, with their best tactical preference, the resulting outcome, and the
+        possible tactical options of the agent to counter
+
+        The election is not tallied again for the opposing agent. The outcome of their best tactical option already is
+        the tally with their ballot swapped, and the tactical search of the agent of interest takes its own votes out of
+        that outcome, so it searches against the total minus both original ballots plus the new ballot of the opposing
+        agent. The swapped ballot is an override of a new election snapshot, so the election itself is not modified
+
+        :param key: A string indicating the type of happiness
+        :param agent: An agent object, for whom the counter tactical votes must be made
+        :param other_index: An integer indicating the index of the opposing agent in the election
+        :param tva_object: A TVA object or an election snapshot, which is not modified
+        :return: Returns a list as mentioned above. Type = [str, list, list, dict]
+        """
+        other_agent = tva_object.get_agents()[other_index]
+
+        # Get the best tactical option of the other agent
+        best_option = self.best_tactical_option(other_agent, tva_object, key)
+
+        # If other agent has no tactical options, nothing to do
+        if best_option is None:
+            return [other_agent, None, None, None]
+
+        # The social outcome if the other agent had chosen their best tactical option
+        new_results = best_option[2]
+        new_results_list = sorted(new_results, key=new_results.get, reverse=True)
+        counter_snapshot = tva_object.with_ballot(other_index, best_option[0], new_results)
+
+        # Depending on the new social outcome, compute the agent's new tactical options
+        return [other_agent, list(best_option[0]),
+                new_results_list,
+                self.get_tactical_options(agent, counter_snapshot)[key],
+                new_results]
+
+    def counter_vote(self, agent, tva_object, counter_memo=None):
         """
         Computes the dictionary of counter votes for an agent, once each other agent has voted tactically.
         For example, when an election is run, each agent may have tactical voting strategies. If an agent was to apply
@@ -151,34 +377,50 @@ class VotingScheme(ABC):
         nested list contains an opposing agent, with their best tactical preference, the resulting outcome, and the
         possible tactical options of the agent to counter
 
-        :param agent: An agent object, for whom the counter tactical votes must be made
-        :param tva_object_copy: A copy of the original tva object
+        The counter of an agent against an opposing agent only depends on both of their ballot types. It is computed
+        once per pair of ballot types, and shared by all opposing agents of the same type, which only differ in the
+        agent object at index 0 of their nested lists. The lists after index 0 must therefore not be modified
+
+        Neither the election nor the memo are modified other than by adding counters to the memo, so calls for
+        different agents of the same election can run in different threads, see get_counter_votes in tva.py
+
+        :param agent: An agent object of the election, for whom the counter tactical votes must be made
+        :param tva_object: A TVA object or an election snapshot, which is not modified
+        :param counter_memo: A dictionary of counters by ballot types, which can be shared by calls for agents of the
+        same election to compute every counter only once. A new one is used if None
         :return: Returns a dictionary as mentioned above
         """
 
         counter_voting_options = {"H_p": [], "H_si": []}
 
-        all_other_agents = [copy(a) for a in tva_object_copy.get_agents() if not a == agent]
+        if counter_memo is None:
+            counter_memo = {}
+
+        for other_index, other_agent in enumerate(tva_object.get_agents()):
+
+            if other_agent == agent:
+                continue
+
+            for key in counter_voting_options:
+
+                memo_key = (key, agent.get_ballot_type(), other_agent.get_ballot_type())
 
-        for other_agent in all_other_agents:
-            counter_voting_options["H_p"].append(self.counter_ts_by_key("H_p",
-                                                                        agent, other_agent,
-                                                                        tva_object_copy,
-                                                                        all_other_agents))
+                # Threads that miss the same counter at once both compute it, with the same outcome
+                counter = counter_memo.get(memo_key)
+                if counter is None:
+                    counter = self.counter_ts_by_key(key, agent, other_index, tva_object)[1:]
+                    counter_memo[memo_key] = counter
 
-            counter_voting_options["H_si"].append(self.counter_ts_by_key("H_si",
-                                                                         agent, other_agent,
-                                                                         tva_object_copy,
-                                                                         all_other_agents))
+                counter_voting_options[key].append([other_agent] + counter)
 
         return counter_voting_options
 
-    def concurrent_vote(self, tva_object_copy):
+    def concurrent_vote(self, tva_object):
         """
         Concurrent voting is when every agent decides to apply their tactical vote at the same time, thereby (maybe)
         changing the outcome of the election.
 
-        :param tva_object_copy
+        :param tva_object: A TVA object or an election snapshot, which is not modified
         :returns - A dictionary with a list for the two types of happiness
 
         The following indexes in each list contains:
@@ -192,77 +434,59 @@ class VotingScheme(ABC):
         2 - Boolean, True if preference list is the agent's original preferences, False if they are tactical
         """
 
-        agent_best_pref = {"H_p": {}, "H_si": {}}
-        social_outcome = {}
-
-        # Get tactical options for each agent
-        for a in tva_object_copy.get_agents():
-
-            all_tact_options = self.tactical_options(a, tva_object_copy)
-
-            for happiness_type in all_tact_options:
-                # If no tactical options to begin with, do not update new preferences
-                if len(all_tact_options[happiness_type]) < 1:
-                    agent_best_pref[happiness_type][a] = list(a.get_preferences().keys())
-                    continue
+        agents = tva_object.get_agents()
+        candidate_string = "".join(tva_object.candidates)
+        lookup = {candidate: index for index, candidate in enumerate(candidate_string)}
+        m = len(candidate_string)
 
-                best_option = None
-                best_happiness = 0
+        # Agents with the same ballot type choose the same best preferences, which are only searched once per type
+        type_indices = {}
+        agent_types = []
+        best_pref_by_type = {"H_p": [], "H_si": []}
 
-                # Get the best tactical option of the agent
-                for option in all_tact_options[happiness_type]:
-                    sublist = all_tact_options[happiness_type][option]
-                    new_prefs = sublist[0]
-                    new_winner = sublist[1]
-                    new_happiness = sublist[3][happiness_type]
+        for a in agents:
 
-                    # A concurrent vote is not considered if the new winner isn't an agent's best preferred
-                    # candidate
-                    if new_winner != new_prefs[0]:
-                        agent_best_pref[happiness_type][a] = list(a.get_preferences().keys())
-                        continue
+            ballot_type = a.get_ballot_type()
 
-                    if new_happiness > best_happiness:
-                        best_option = sublist
-                        best_happiness = new_happiness
+            if ballot_type not in type_indices:
+                type_indices[ballot_type] = len(type_indices)
 
-                # Add best option to the dict. Sometimes
-                if best_option is None:
-                    agent_best_pref[happiness_type][a] = list(a.get_preferences().keys())
-                else:
-                    agent_best_pref[happiness_type][a] = best_option[0]
+                all_tact_options = self.get_tactical_options(a, tva_object)
 
-        # Run an election for each happiness type
-        for happiness_type in agent_best_pref:
+                for happiness_type in best_pref_by_type:
+                    best_pref_by_type[happiness_type].append(self.get_concurrent_preferences(
+                        a, all_tact_options[happiness_type], happiness_type))
 
-            all_agents = [agent for agent in agent_best_pref[happiness_type]]
+            agent_types.append(type_indices[ballot_type])
 
-            agents_original_prefs = {}
+        agent_types = np.array(agent_types, dtype=np.intp)
+        original_ballots = np.array([[lookup[candidate] for candidate in ballot_type] for ballot_type in type_indices],
+                                    dtype=np.intp).reshape(-1, m)
+        positions = np.arange(m, dtype=np.intp)[np.newaxis, :] * m
+        scores = self.get_scores(m)
 
-            # Save original preference
-            for agent in all_agents:
-                agents_original_prefs[agent] = agent.preferences
+        social_outcome = {}
 
-            for agent in all_agents:
+        # Run an election for each happiness type
+        for happiness_type, best_prefs in best_pref_by_type.items():
 
-                pref_dict = {}
-                for candidate in agent_best_pref[happiness_type][agent]:
-                    pref_dict[candidate] = 0
+            # The best preferences of all agents form one ballot matrix, which is tallied with a single product of the
+            # score vector with its position counts, so the agents themselves are never modified
+            best_ballots = np.array([[lookup[candidate] for candidate in best_pref] for best_pref in best_prefs],
+                                    dtype=np.intp).reshape(-1, m)
+            flat = positions + best_ballots[agent_types]
+            tally = scores @ np.bincount(flat.ravel(), minlength=m * m).reshape(m, m)
 
-                # Tally votes with new prefs
-                self.tally_personal_votes(pref_dict)
-                agent.preferences = pref_dict
+            new_results = copy(tva_object.candidates)
+            for candidate, votes in zip(candidate_string, tally.tolist()):
+                new_results[candidate] += votes
 
-            new_results = self.run_scheme(tva_object_copy.candidates, all_agents)
             latest_winner = get_winner(new_results)
 
-            # Revert to original preferences to perform boolean check below
-            for agent in all_agents:
-                agent.preferences = agents_original_prefs[agent]
+            is_original = (best_ballots == original_ballots).all(axis=1)[agent_types].tolist()
 
-            agent_list = [[agent, agent_best_pref[happiness_type][agent],
-                           agent_best_pref[happiness_type][agent] == list(agent.get_preferences().keys())]
-                          for agent in agent_best_pref[happiness_type]]
+            agent_list = [[agent, best_prefs[agent_type], original]
+                          for agent, agent_type, original in zip(agents, agent_types.tolist(), is_original)]
 
             agent_list.insert(0, latest_winner)
             agent_list.insert(1, new_results)
@@ -271,6 +495,33 @@ class VotingScheme(ABC):
 
         return social_outcome
 
+    def get_concurrent_preferences(self, agent, tactical_options, happiness_type):
+        """
+        Gets the preferences an agent votes with in a concurrent vote, which are those of their best tactical option.
+        A tactical option is not considered if its new winner isn't the first preference of its preference list
+
+        :param agent: An agent object
+        :param tactical_options: A dictionary of tactical options of the agent for the type of happiness
+        :param happiness_type: A string indicating the type of happiness
+        :return: Returns a list of candidates, which are the original preferences of the agent if no tactical option
+        is considered
+        """
+        best_option = None
+        best_happiness = 0
+
+        for option in tactical_options.values():
+            new_prefs = option[0]
+            new_happiness = option[3][happiness_type]
+
+            if option[1] == new_prefs[0] and new_happiness > best_happiness:
+                best_option = option
+                best_happiness = new_happiness
+
+        if best_option is None:
+            return list(agent.get_preferences().keys())
+
+        return best_option[0]
+
     @abstractmethod
     def tactical_options(self, agent, tva_object):
         """
@@ -284,6 +535,7 @@ class VotingScheme(ABC):
         # TODO index 1 = new voting preference list
         # TODO index 2 = new winner because of this agent's new preference list
         # TODO index 3 = new happiness after subsequent re-election
+        Every option is a TacticalOption record, which can still be indexed like the list described above
 
         :param tva_object: A TVA object
         :param agent: The agent object for which tactical voting must be applied
@@ -304,65 +556,68 @@ class Borda(VotingScheme):
     """
 
     def tactical_options(self, agent, tva_object):
-        results = tva_object.results
-        result_list = sorted(results, key=lambda k: results[k], reverse=True)
-        index = result_list.index(list(agent.preferences.keys())[0])
+        return {key: dict(enumerate(self.iterate_borda_options(agent, tva_object, key))) for key in ("H_p", "H_si")}
+
+    def iterate_tactical_options(self, agent, tva_object, key):
+        """
+        Iterates over the tactical options of an agent for one type of happiness. Options that were already searched
+        are taken from the tactical cache, otherwise the search of Strategies_borda only runs as far as the caller
+        takes options
+
+        :param agent: The agent object for which tactical voting must be applied
+        :param tva_object: A TVA object
+        :param key: A string indicating the type of happiness
+        :return: Yields tactical option objects
+        """
+        cache = getattr(tva_object, "tactical_cache", None)
+
+        if cache is not None:
+            tactical_set = cache.peek(cache.get_key(self, agent, self.get_remainder(agent, tva_object)))
+
+            if tactical_set is not None:
+                yield from tactical_set[key].values()
+                return
+
+        yield from self.iterate_borda_options(agent, tva_object, key)
+
+    def iterate_borda_options(self, agent, tva_object, key, batch_size=20):
+        """
+        Searches the tactical options of an agent for one type of happiness. The tactical ballots are enumerated one
+        at a time, and evaluated in batches, see evaluate_personal_votes
 
-        original_agents = []
-        # remake agent set without our agent
-        old_happiness = agent.get_happiness(tva_object.results)
+        :param agent: The agent object for which tactical voting must be applied
+        :param tva_object: A TVA object
+        :param key: A string indicating the type of happiness
+        :param batch_size: An integer indicating the number of ballots that are evaluated together
+        :return: Yields tactical option objects
+        """
+        prefs = agent.get_preferences()
         old_winner = get_winner(tva_object.results)
 
-        for other_agent in tva_object.agents:
-            if other_agent.name != agent.name:
-                original_agents.append(other_agent)
-        new_results = self.run_scheme(tva_object.candidates, original_agents)
+        # Tallied votes of everyone else, each tactical preference list is added on top of it
+        remainder = self.get_remainder(agent, tva_object)
 
         borda_strat = strategies_borda.Strategies_borda("Borda", 20)
-        [res_pref, res_si] = borda_strat.check_if_best(agent, new_results, index, old_winner)
-        tactical_set = {"H_p": {}, "H_si": {}}
 
-        if len(res_pref) > 0:
-            res_pref_winner = next(iter(res_pref[0]))
-            i = 0
-            for x in res_pref:
-                alt_agent = Agent(agent.name, ''.join(x), tva_object.scheme)
-                original_agents.append(alt_agent)
-                new_results = self.run_scheme(tva_object.candidates, original_agents)
-                new_happiness = agent.get_happiness(new_results)
+        if key == "H_p":
+            options = borda_strat.iterate_best_winner(prefs, remainder, old_winner)
+        else:
+            results = tva_object.results
+            result_list = sorted(results, key=lambda k: results[k], reverse=True)
+            index = result_list.index(agent.get_ballot_type()[0])
 
-                new_overall_happiness = get_tactical_overall_happiness(tva_object, agent,
-                                                                       new_happiness, new_results)
-                tactical_set["H_p"][i] = [list(x.keys()), res_pref_winner,
-                                          new_results, new_happiness,
-                                          new_overall_happiness]
-                i += 1
-                original_agents.pop()
-
-        if len(res_si) > 0:
-            j = 0
-            for y in res_si:
-                alt_agent = Agent(agent.name, ''.join(y), tva_object.scheme)
-                original_agents.append(alt_agent)
-                new_results = self.run_scheme(tva_object.candidates, original_agents)
-                new_happiness = agent.get_happiness(new_results)
-                new_winner = get_winner(new_results)
+            options = borda_strat.iterate_highest_position(agent.get_ballot_type()[0], prefs, remainder, index)
 
-                new_overall_happiness = get_tactical_overall_happiness(tva_object, agent,
-                                                                       new_happiness, new_results)
-                tactical_set["H_si"][j] = [list(y.keys()), new_winner,
-                                           new_results, new_happiness,
-                                           new_overall_happiness]
-                j += 1
-                original_agents.pop()
-        return tactical_set
+        options = islice(options, borda_strat.opt_limit)
 
-    def tally_personal_votes(self, preferences):
-        m = len(preferences)
-        i = 1
-        for key in preferences:
-            preferences[key] = m - i
-            i += 1
+        while True:
+            batch = list(islice(options, batch_size))
+            if len(batch) == 0:
+                return
+            yield from self.evaluate_personal_votes(agent, tva_object, remainder, batch)
+
+    def score_vector(self, num_candidates):
+        return list(range(num_candidates - 1, -1, -1))
 
 
 class Plurality(VotingScheme):
@@ -372,10 +627,8 @@ class Plurality(VotingScheme):
     The agents highest preference gets a score of 1
     """
 
-    def tally_personal_votes(self, preferences):
-
-        first_preference = next(iter(preferences))
-        preferences[first_preference] += 1
+    def score_vector(self, num_candidates):
+        return [1] + [0] * (num_candidates - 1)
 
     def tactical_options(self, agent, tva_object):
 
@@ -394,7 +647,7 @@ class Plurality(VotingScheme):
         if not tva_object.results[winner] > (total_agents / 2):
 
             original_list = list(agent.preferences)
-            stop_index = original_list.index(winner)
+            stop_index = agent.get_rank(winner)
 
             for i in range(1, stop_index):
 
@@ -414,12 +667,10 @@ class Plurality(VotingScheme):
 
                 if new_winner != winner:
                     agent_happiness = agent.get_happiness(results_copy)
-                    new_overall_happiness = get_tactical_overall_happiness(tva_object, agent,
-                                                                           agent_happiness, results_copy)
 
-                    tactical_set["H_p"][i] = [new_pref_list, new_winner,
-                                              results_copy, agent_happiness,
-                                              new_overall_happiness]
+                    tactical_set["H_p"][i] = TacticalOption(new_pref_list, new_winner,
+                                                            results_copy, agent_happiness,
+                                                            tva_object.results, tva_object.get_profile())
 
         """
         For percentage_social_index
@@ -429,6 +680,37 @@ class Plurality(VotingScheme):
 
         return tactical_set
 
+    def get_batch_best_tactical_happinesses(self, candidate_string, ballots, ranks, tallies):
+        """
+        Vectorized version of tactical_options, for every agent of many elections at once. Putting the candidate in
+        position i first moves the vote of the agent from their first preference to that candidate, which is tried for
+        every position above the winner at once
+        """
+        tie_order = get_tie_order(candidate_string)
+        swap_outcomes = self.get_swap_outcomes(tallies, tie_order)
+        trials, n_voters, m = ballots.shape
+
+        winners = get_winner_indices(tallies, tie_order)
+        winner_ranks = ranks[np.arange(trials)[:, np.newaxis], np.arange(n_voters), winners[:, np.newaxis]]
+
+        best_happinesses = {"H_p": np.full((trials, n_voters), np.nan), "H_si": np.full((trials, n_voters), np.nan)}
+
+        # If more than half agents voted for the winning candidate, there is no tactical voting strategy
+        has_options = ~(tallies[np.arange(trials), winners] > n_voters / 2)[:, np.newaxis]
+
+        for i in range(1, m):
+            is_option = has_options & (i < winner_ranks)
+            if not is_option.any():
+                continue
+
+            new_winners, happinesses = self.get_swap_happinesses(ballots, ranks, swap_outcomes, ballots[..., i],
+                                                                 ballots[..., 0])
+
+            is_option &= new_winners != winners[:, np.newaxis]
+            best_happinesses["H_p"] = np.fmax(best_happinesses["H_p"], np.where(is_option, happinesses["H_p"], np.nan))
+
+        return best_happinesses
+
 
 class AntiPlurality(VotingScheme):
     """
@@ -437,15 +719,8 @@ class AntiPlurality(VotingScheme):
     The agent's lowest preference gets a score of 0, while others get 1
     """
 
-    def tally_personal_votes(self, preferences):
-
-        i = 0
-        for key in preferences:
-
-            if i < len(preferences) - 1:
-                preferences[key] += 1
-
-            i += 1
+    def score_vector(self, num_candidates):
+        return [1] * (num_candidates - 1) + [0]
 
     def tactical_options(self, agent, tva_object):
 
@@ -457,7 +732,7 @@ class AntiPlurality(VotingScheme):
 
         winner = get_winner(tva_object.results)
         original_list = list(agent.preferences)
-        winner_index = original_list.index(winner)
+        winner_index = agent.get_rank(winner)
 
         # if the winner is not already in the last position I can investigate if I have a
         # tactical voting option
@@ -477,12 +752,10 @@ class AntiPlurality(VotingScheme):
             agent_happiness = agent.get_happiness(results_copy)
 
             if agent_happiness["H_p"] > agent.get_happiness(tva_object.results)["H_p"]:
-                new_overall_happiness = get_tactical_overall_happiness(tva_object, agent,
-                                                                       agent_happiness, results_copy)
 
-                tactical_set["H_p"][0] = [new_pref_list, new_winner,
-                                          results_copy, agent_happiness,
-                                          new_overall_happiness]
+                tactical_set["H_p"][0] = TacticalOption(new_pref_list, new_winner,
+                                                        results_copy, agent_happiness,
+                                                        tva_object.results, tva_object.get_profile())
 
         """
         For percentage_social_index
@@ -512,6 +785,8 @@ class AntiPlurality(VotingScheme):
 
             stop_index = results_list.index(pref_list[0])
 
+            remainder = self.get_remainder(agent, tva_object)
+
             for i in range(0, stop_index):
 
                 list_copy = copy(pref_list)
@@ -519,24 +794,10 @@ class AntiPlurality(VotingScheme):
                 temp_i = results_list[i]
                 temp_last = pref_list[-1]
 
-                list_copy[pref_list.index(temp_i)] = temp_last
+                list_copy[agent.get_rank(temp_i)] = temp_last
                 list_copy[-1] = temp_i
-                agent_copy = copy(agent)
-
-                new_prefs = {}
-                for candidate in list_copy:
-                    new_prefs[candidate] = 0
-
-                self.tally_personal_votes(new_prefs)
-                agent_copy.preferences = new_prefs
-
-                new_agents = [agent_copy]
-
-                for a in tva_object.get_agents():
-                    if not a == agent:
-                        new_agents.append(a)
 
-                new_results = self.run_scheme(tva_object.candidates, new_agents)
+                new_results = self.tally_preference_list(remainder, list_copy)
                 new_winner = get_winner(new_results)
 
                 new_happiness = agent.get_happiness(new_results)
@@ -544,14 +805,70 @@ class AntiPlurality(VotingScheme):
                 if new_happiness["H_si"] <= original_happiness["H_si"]:
                     continue
 
-                new_overall_happiness = get_tactical_overall_happiness(tva_object, agent,
-                                                                       new_happiness, new_results)
-
-                tactical_set["H_si"][i] = [list_copy, new_winner, new_results,
-                                           new_happiness, new_overall_happiness]
+                tactical_set["H_si"][i] = TacticalOption(list_copy, new_winner, new_results,
+                                                         new_happiness, tva_object.results, tva_object.get_profile())
 
         return tactical_set
 
+    def get_batch_best_tactical_happinesses(self, candidate_string, ballots, ranks, tallies):
+        """
+        Vectorized version of tactical_options, for every agent of many elections at once. Swapping a candidate with
+        the last preference moves the vote of the agent from that candidate to the last preference, which is tried for
+        the winner, and for every candidate above the first preference in the results at once
+        """
+        tie_order = get_tie_order(candidate_string)
+        swap_outcomes = self.get_swap_outcomes(tallies, tie_order)
+        tie_ranks = np.argsort(tie_order)
+        trials, n_voters, m = ballots.shape
+
+        winners = np.broadcast_to(get_winner_indices(tallies, tie_order)[:, np.newaxis], (trials, n_voters))
+        happinesses = get_happiness_arrays(ballots, ranks, tallies, tie_order)
+
+        first = ballots[..., 0].astype(np.intp)
+        least_preferred = ballots[..., -1].astype(np.intp)
+
+        best_happinesses = {"H_p": np.full((trials, n_voters), np.nan), "H_si": np.full((trials, n_voters), np.nan)}
+
+        """
+        For percentage_my_preference
+        """
+
+        # Swap the winner with the last preference, unless it is already there
+        _, new_happinesses = self.get_swap_happinesses(ballots, ranks, swap_outcomes, least_preferred, winners)
+
+        is_option = (least_preferred != winners) & (new_happinesses["H_p"] > happinesses["H_p"])
+        best_happinesses["H_p"] = np.where(is_option, new_happinesses["H_p"], np.nan)
+
+        """
+        For percentage_social_index
+        """
+
+        first_votes = np.take_along_axis(tallies, first, axis=-1)
+        least_votes = np.take_along_axis(tallies, least_preferred, axis=-1) + 1
+
+        # Not possible if one more vote for the last preference would put it above the first preference
+        has_options = ~((least_votes > first_votes) |
+                        ((least_votes == first_votes) & (tie_ranks[least_preferred] < tie_ranks[first])))
+
+        # The candidates in the results before the first preference, where ties keep the order of the candidate string
+        results_order = np.argsort(-tallies, axis=-1, kind="stable")
+        result_positions = np.argsort(results_order, axis=-1)
+        stop_indices = np.take_along_axis(result_positions, first, axis=-1)
+
+        for i in range(m - 1):
+            is_option = has_options & (i < stop_indices)
+            if not is_option.any():
+                continue
+
+            losses = np.broadcast_to(results_order[:, i:i + 1], (trials, n_voters))
+            _, new_happinesses = self.get_swap_happinesses(ballots, ranks, swap_outcomes, least_preferred, losses)
+
+            is_option &= new_happinesses["H_si"] > happinesses["H_si"]
+            best_happinesses["H_si"] = np.fmax(best_happinesses["H_si"],
+                                               np.where(is_option, new_happinesses["H_si"], np.nan))
+
+        return best_happinesses
+
 
 class VotingForTwo(VotingScheme):
     """
@@ -560,14 +877,8 @@ class VotingForTwo(VotingScheme):
     First and second choice get a score of 1
     """
 
-    def tally_personal_votes(self, preferences):
-
-        iterable = iter(preferences)
-
-        preference = next(iterable)
-        preferences[preference] += 1
-        preference = next(iterable)
-        preferences[preference] += 1
+    def score_vector(self, num_candidates):
+        return [1, 1] + [0] * (num_candidates - 2)
 
     def tactical_options(self, agent, tva_object):
 
@@ -579,7 +890,7 @@ class VotingForTwo(VotingScheme):
 
         winner = get_winner(tva_object.results)
         original_list = list(agent.preferences)
-        winner_index = original_list.index(winner)
+        winner_index = agent.get_rank(winner)
 
         # if the winner is not in the third position of my preference order I can investigate
         # if I have tactical voting options
@@ -602,12 +913,10 @@ class VotingForTwo(VotingScheme):
 
                     if new_winner == original_list[0]:
                         agent_happiness = agent.get_happiness(results_copy)
-                        new_overall_happiness = get_tactical_overall_happiness(tva_object, agent,
-                                                                               agent_happiness, results_copy)
 
-                        tactical_set["H_p"][i - 2] = [new_pref_list, new_winner,
-                                                      results_copy, agent_happiness,
-                                                      new_overall_happiness]
+                        tactical_set["H_p"][i - 2] = TacticalOption(new_pref_list, new_winner,
+                                                                    results_copy, agent_happiness,
+                                                                    tva_object.results, tva_object.get_profile())
 
             else:
 
@@ -624,14 +933,12 @@ class VotingForTwo(VotingScheme):
 
                     new_winner = get_winner(results_copy)
 
-                    if original_list.index(new_winner) < winner_index:
+                    if agent.get_rank(new_winner) < winner_index:
                         agent_happiness = agent.get_happiness(results_copy)
-                        new_overall_happiness = get_tactical_overall_happiness(tva_object, agent,
-                                                                               agent_happiness, results_copy)
 
-                        tactical_set["H_p"][i - 2] = [new_pref_list, new_winner,
-                                                      results_copy, agent_happiness,
-                                                      new_overall_happiness]
+                        tactical_set["H_p"][i - 2] = TacticalOption(new_pref_list, new_winner,
+                                                                    results_copy, agent_happiness,
+                                                                    tva_object.results, tva_object.get_profile())
 
         """
         For percentage_social_index
@@ -645,6 +952,7 @@ class VotingForTwo(VotingScheme):
         original_happiness = agent.get_happiness(tva_object.results)
 
         results_dict = copy(tva_object.results)
+        remainder = self.get_remainder(agent, tva_object)
 
         if not results_dict[second_pref] - results_dict[first_pref] >= 2 or \
                 (results_dict[second_pref] - results_dict[first_pref] == 1 and second_pref < first_pref):
@@ -669,21 +977,7 @@ class VotingForTwo(VotingScheme):
                     pref_list_copy[i] = second_pref
                     pref_list_copy[1] = temp
 
-                    new_pref_dict = {}
-                    for element in pref_list_copy:
-                        new_pref_dict[element] = 0
-
-                    self.tally_personal_votes(new_pref_dict)
-                    agent_copy = copy(agent)
-                    agent_copy.preferences = new_pref_dict
-
-                    new_agents = [agent_copy]
-
-                    for a in tva_object.get_agents():
-                        if not a == agent:
-                            new_agents.append(a)
-
-                    new_results = self.run_scheme(tva_object.candidates, new_agents)
+                    new_results = self.tally_preference_list(remainder, pref_list_copy)
                     new_winner = get_winner(new_results)
 
                     new_happiness = agent.get_happiness(new_results)
@@ -691,10 +985,224 @@ class VotingForTwo(VotingScheme):
                     if new_happiness["H_si"] <= original_happiness["H_si"]:
                         continue
 
-                    new_overall_happiness = get_tactical_overall_happiness(tva_object, agent, new_happiness,
-                                                                           new_results)
+                    tactical_set["H_si"][i - 2] = TacticalOption(pref_list_copy, new_winner, new_results,
+                                                                 new_happiness, tva_object.results,
+                                                                 tva_object.get_profile())
+
+        return tactical_set
+
+    def get_batch_best_tactical_happinesses(self, candidate_string, ballots, ranks, tallies):
+        """
+        Vectorized version of tactical_options, for every agent of many elections at once. Swapping the second
+        preference with the candidate in position i moves the vote of the agent from the second preference to that
+        candidate, which is tried for every position below the first two at once, and used for both types of happiness
+        """
+        tie_order = get_tie_order(candidate_string)
+        swap_outcomes = self.get_swap_outcomes(tallies, tie_order)
+        tie_ranks = np.argsort(tie_order)
+        trials, n_voters, m = ballots.shape
+
+        winners = get_winner_indices(tallies, tie_order)
+        winner_ranks = ranks[np.arange(trials)[:, np.newaxis], np.arange(n_voters), winners[:, np.newaxis]]
+        happinesses = get_happiness_arrays(ballots, ranks, tallies, tie_order)
+
+        first = ballots[..., 0].astype(np.intp)
+        second = ballots[..., 1].astype(np.intp)
+        first_votes = np.take_along_axis(tallies, first, axis=-1)
+
+        best_happinesses = {"H_p": np.full((trials, n_voters), np.nan), "H_si": np.full((trials, n_voters), np.nan)}
+
+        # For percentage_social_index, not possible if the second preference has at least two more votes than the
+        # first preference
+        has_options = np.take_along_axis(tallies, second, axis=-1) - first_votes < 2
+
+        for i in range(2, m):
+            candidates = ballots[..., i].astype(np.intp)
+            new_winners, new_happinesses = self.get_swap_happinesses(ballots, ranks, swap_outcomes, candidates,
+                                                                     second)
 
-                    tactical_set["H_si"][i - 2] = [pref_list_copy, new_winner, new_results,
-                                                   new_happiness, new_overall_happiness]
+            """
+            For percentage_my_preference
+            """
+
+            # With the winner in second position, the first preference must win, and with the winner below the third
+            # position, a candidate above the winner must win
+            new_winner_ranks = np.take_along_axis(ranks, new_winners[..., np.newaxis].astype(np.intp), axis=-1)[..., 0]
+            is_option = ((winner_ranks == 1) & (new_winners == first)) | \
+                        ((winner_ranks > 2) & (i < winner_ranks) & (new_winner_ranks < winner_ranks))
+
+            best_happinesses["H_p"] = np.fmax(best_happinesses["H_p"],
+                                              np.where(is_option, new_happinesses["H_p"], np.nan))
+
+            """
+            For percentage_social_index
+            """
+
+            # The candidate is skipped if one more vote would put it above the first preference, and it wins the tie
+            candidate_votes = np.take_along_axis(tallies, candidates, axis=-1) + 1
+            is_skipped = (candidate_votes > first_votes) & (tie_ranks[candidates] < tie_ranks[first])
+
+            is_option = has_options & ~is_skipped & (new_happinesses["H_si"] > happinesses["H_si"])
+            best_happinesses["H_si"] = np.fmax(best_happinesses["H_si"],
+                                               np.where(is_option, new_happinesses["H_si"], np.nan))
+
+        return best_happinesses
+
+
+class PositionalScheme(VotingScheme):
+    """
+    Generic positional voting class
+
+    Positional schemes that do not have their own class are declared as data in POSITIONAL_RULES, by a function that
+    returns their score vector. Their tactical options are found greedily: the candidate to push is put first, and the
+    remaining scores are handed out so that the most threatening candidates receive the lowest scores
+    """
+
+    score_function = None
+
+    def score_vector(self, num_candidates):
+        return list(self.score_function(num_candidates))
+
+    def get_leeway(self, candidate, remainder, scores):
+        """
+        Computes how many points every other candidate can receive without beating the candidate, when the candidate
+        is put first in the preference list
+
+        The leeway of a candidate x is a pair of its margin to the candidate and whether the candidate wins a tie with
+        x. A score fits under the leeway if it is below the margin, or equal to it and the candidate wins the tie,
+        which is exactly when (score, 1) <= leeway. Sorting the pairs also orders the candidates from the least to the
+        most leeway, so scores that are not whole numbers need no margin of 1 for lost ties
+
+        :param candidate: The candidate that is put first
+        :param remainder: A dictionary of the tallied votes of all other agents
+        :param scores: The score vector of the scheme
+        :return: Returns a dictionary with the leeway of every other candidate
+        """
+        up_bound = remainder[candidate] + scores[0]
+        leeway = {}
+
+        for x in remainder:
+            if x == candidate:
+                continue
+
+            leeway[x] = (up_bound - remainder[x], 1 if candidate < x else 0)
+
+        return leeway
+
+    def tactical_options(self, agent, tva_object):
+
+        tactical_set = {"H_p": {}, "H_si": {}}
+
+        scores = self.score_vector(len(tva_object.candidates))
+        pref_list = list(agent.preferences)
+
+        remainder = self.get_remainder(agent, tva_object)
+
+        original_happiness = agent.get_happiness(tva_object.results)
+        winner = get_winner(tva_object.results)
+
+        """
+        For percentage_my_preference
+        """
+
+        # The first preferred candidate that can be made to win gives the best outcome
+        for candidate in pref_list[:agent.get_rank(winner)]:
+
+            leeway = self.get_leeway(candidate, remainder, scores)
+            new_pref_list = [candidate] + sorted(leeway, key=lambda k: leeway[k], reverse=True)
+
+            new_results = self.tally_preference_list(remainder, new_pref_list)
+            new_winner = get_winner(new_results)
+
+            if new_winner == candidate:
+                agent_happiness = agent.get_happiness(new_results)
+
+                tactical_set["H_p"][0] = TacticalOption(new_pref_list, new_winner, new_results,
+                                                        agent_happiness, tva_object.results, tva_object.get_profile())
+                break
+
+        """
+        For percentage_social_index
+        """
+
+        first_pref = pref_list[0]
+        leeway = self.get_leeway(first_pref, remainder, scores)
+
+        # Hand out the lowest scores to the candidates with the least leeway, as long as they stay below our first
+        # preference. The others cannot be kept below it anyway, and get the highest scores
+        losers = []
+        position = len(scores) - 1
+        for candidate in sorted(leeway, key=lambda k: leeway[k]):
+            if (scores[position], 1) <= leeway[candidate]:
+                losers.append(candidate)
+                position -= 1
+
+        others = [candidate for candidate in leeway if candidate not in losers]
+        new_pref_list = [first_pref] + others + losers[::-1]
+
+        new_results = self.tally_preference_list(remainder, new_pref_list)
+        new_happiness = agent.get_happiness(new_results)
+
+        if new_happiness["H_si"] > original_happiness["H_si"]:
+
+            tactical_set["H_si"][0] = TacticalOption(new_pref_list, get_winner(new_results), new_results,
+                                                     new_happiness, tva_object.results, tva_object.get_profile())
 
         return tactical_set
+
+
+def k_approval_scores(k, num_candidates):
+    """
+    The first k preferences get a score of 1
+    """
+    return [1] * min(k, num_candidates) + [0] * max(num_candidates - k, 0)
+
+
+def truncated_borda_scores(k, num_candidates):
+    """
+    The first k preferences get a score of k, k - 1, ..., 1 and the others get 0
+    """
+    return [max(k - i, 0) for i in range(num_candidates)]
+
+
+def dowdall_scores(num_candidates):
+    """
+    The i-th preference gets a score of 1 / i. The scores are scaled by the least common multiple of 1, ..., m, so
+    that they are whole numbers and every tally is exact. Scaling all scores does not change any outcome
+    """
+    scale = lcm(*range(1, num_candidates + 1))
+
+    return [scale // i for i in range(1, num_candidates + 1)]
+
+
+# Positional voting schemes declared by their score vector. Adding a rule here makes it available to the TVA by name
+POSITIONAL_RULES = {
+    "ThreeApproval": partial(k_approval_scores, 3),
+    "TruncatedBorda": partial(truncated_borda_scores, 3),
+    "Dowdall": dowdall_scores,
+}
+
+declared_schemes = {}
+
+
+def get_voting_scheme(voting_scheme):
+    """
+    Gets the class of a voting scheme by its name. Schemes declared in POSITIONAL_RULES are turned into a subclass of
+    PositionalScheme the first time they are requested
+
+    :param voting_scheme: A string indicating the type of voting
+    :return: Returns the class of the voting scheme
+    """
+    scheme = globals().get(voting_scheme)
+
+    if isinstance(scheme, type) and issubclass(scheme, VotingScheme):
+        return scheme
+
+    if voting_scheme not in POSITIONAL_RULES:
+        raise Exception(f"{voting_scheme} has not been implemented")
+
+    if voting_scheme not in declared_schemes:
+        declared_schemes[voting_scheme] = type(voting_scheme, (PositionalScheme,),
+                                               {"score_function": staticmethod(POSITIONAL_RULES[voting_scheme])})
+
+    return declared_schemes[voting_scheme]